@@ -6,13 +6,20 @@
 
 import os
 import webbrowser
+from functools import partial
 import globalVars
 import globalPluginHandler
 from .from_clipboard import FromClipboard
 from .database import DatabaseManager
-from .dialogs import LinkManager, validateInput, mute, UNCATEGORIZED
+from .navigation import NavigationIndex
+from .worker import DBWorker
+from .path_checker import PathHealthScanner
+from .instrumentation import DBInstrumentation
+from .profiler import SessionProfiler
+from .watchdog import StallWatchdog
+from .hooks import hook_methods, call_after
+from .dialogs import LinkManager, validateInput, UNCATEGORIZED
 from scriptHandler import script, getLastScriptRepeatCount
-import wx
 import gui
 import ui
 import api
@@ -22,13 +29,23 @@ try:
 	addonHandler.initTranslation()
 except addonHandler.AddonError:
 	from logHandler import log
-	log.warning('Unable to initialise translations. This may be because the addon is running from NVDA scratchpad.')
+	log.warning(
+		'Unable to initialise translations. This may be because the addon is running from NVDA scratchpad.'
+	)
 
 
 def _get_db_path():
 	return os.path.join(globalVars.appArgs.configPath, "gestor_enlaces.db")
 
 
+def _get_slow_log_path():
+	return os.path.join(globalVars.appArgs.configPath, "gestor_enlaces_lento.log")
+
+
+def _get_profiles_dir():
+	return os.path.join(globalVars.appArgs.configPath, "gestor_enlaces_perfiles")
+
+
 def _get_json_path():
 	return os.path.join(globalVars.appArgs.configPath, "links.json")
 
@@ -40,46 +57,84 @@ def disableInSecureMode(decoratedCls):
 
 
 @disableInSecureMode
+@hook_methods("script", prefixes=("script_",))
 class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 	def __init__(self):
 		super(GlobalPlugin, self).__init__()
 		self.link_manager = None
 		self.addLinkInfo = "", ""
 
-		self._nav_links = []
-		self._nav_categories = []
+		self._nav_index = None
 		self._nav_link_index = -1
 		self._nav_cat_index = -1
+		self._profiler = SessionProfiler(_get_profiles_dir())
+		self._watchdog = StallWatchdog()
+		self._watchdog.start()
 
+		# Se quedan en None si la base de datos no se abre; los scripts siguen pudiendo usarlos.
+		self._db_manager = None
+		self._db_stats = None
+		self._db_worker = None
+		self._health_scanner = None
 		self._db_path = _get_db_path()
 		try:
 			self._db_manager = DatabaseManager(self._db_path)
 		except Exception as e:
 			from logHandler import log
 			log.error("Gestor de Enlaces: Error al inicializar la base de datos: %s" % str(e))
-			self._db_manager = None
 			return
 
+		self._nav_index = NavigationIndex(self._db_manager, UNCATEGORIZED)
+		self._db_stats = DBInstrumentation(self._db_manager, _get_slow_log_path())
+		self._db_worker = DBWorker()
 		self._auto_migrate()
+		self._health_scanner = PathHealthScanner(self._db_manager)
+		self._health_scanner.start()
 
 	def _auto_migrate(self):
+		# Se ejecuta en el hilo de la base de datos para no retrasar el arranque de NVDA.
 		json_path = _get_json_path()
-		if os.path.exists(json_path) and self._db_manager.get_item_count() == 0:
-			try:
-				rows = self._db_manager.migrate_from_json(json_path)
-				if rows > 0:
-					from logHandler import log
-					log.info(f"Gestor de Enlaces: {rows} elementos migrados desde links.json a SQLite.")
-			except Exception as e:
-				from logHandler import log
-				log.error(f"Gestor de Enlaces: Error en migración automática: {e}")
+		if os.path.exists(json_path):
+			self._db_worker.submit(
+				partial(self._run_auto_migration, json_path),
+				on_success=self._on_auto_migrate_done,
+				on_error=self._on_auto_migrate_error
+			)
+
+	def _run_auto_migration(self, json_path):
+		# Una migración interrumpida se reanuda aunque la base de datos ya tenga elementos.
+		if self._db_manager.has_pending_json_migration() or self._db_manager.get_item_count() == 0:
+			return self._db_manager.migrate_from_json(json_path)
+		return 0
+
+	def _on_auto_migrate_done(self, rows):
+		if rows > 0:
+			from logHandler import log
+			log.info(f"Gestor de Enlaces: {rows} elementos migrados desde links.json a SQLite.")
+
+	def _on_auto_migrate_error(self, e):
+		from logHandler import log
+		log.error(f"Gestor de Enlaces: Error en migración automática: {e}")
 
 	def terminate(self):
-		if self._db_manager:
-			self._db_manager.close()
+		if self._profiler.running:
+			self._profiler.stop()
+		self._watchdog.stop()
+		if self._watchdog.stall_count:
+			from logHandler import log
+			log.info(
+				f"Gestor de Enlaces: {self._watchdog.stall_count} bloqueos del hilo principal, "
+				f"{self._watchdog.stall_total * 1000:.0f} ms en total. Peores casos:\n"
+				+ "\n".join(self._watchdog.summary())
+			)
 		if self.link_manager:
 			self.link_manager.Destroy()
 			self.link_manager = None
+		if self._db_manager:
+			self._db_stats.disable()
+			self._health_scanner.stop()
+			self._db_worker.stop()
+			self._db_manager.close()
 		super(GlobalPlugin, self).terminate()
 
 	def create_or_toggle_link_manager(self, addLink=False):
@@ -91,7 +146,9 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		try:
 			if not self.link_manager:
 				# Translators: Título del diálogo principal.
-				self.link_manager = LinkManager(gui.mainFrame, _('Gestor de Enlaces'), self._db_manager, self._db_path)
+				self.link_manager = LinkManager(
+					gui.mainFrame, _('Gestor de Enlaces'), self._db_manager, self._db_path, self._db_worker
+				)
 
 			if self.link_manager.IsShown():
 				try:
@@ -143,7 +200,7 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 			self.refreshLinkInfo()
 		elif getLastScriptRepeatCount() == 1:
 			addLink = True
-		wx.CallAfter(self.create_or_toggle_link_manager, addLink)
+		call_after(self.create_or_toggle_link_manager, addLink)
 
 	@script(
 		# Translators: Descripción del script para abrir enlace desde portapapeles.
@@ -152,26 +209,22 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		category=_("Gestor De Enlaces")
 	)
 	def script_open_clipboard_link(self, gesture):
-		wx.CallAfter(FromClipboard, gui.mainFrame)
+		call_after(FromClipboard, gui.mainFrame, self._db_manager, self._db_worker)
 
 	def _refresh_nav_data(self):
-		all_items = self._db_manager.get_all_items_for_nav()
-		self._nav_links = []
-		for title, value, item_type, cat_name in all_items:
-			self._nav_links.append((title, value, cat_name or UNCATEGORIZED))
-
-		all_cats = set()
-		for _title, _value, cat in self._nav_links:
-			all_cats.add(cat)
-		for c in self._db_manager.get_all_categories():
-			all_cats.add(c)
-		self._nav_categories = sorted(list(all_cats), key=lambda s: s.lower())
+		if self._nav_index:
+			self._nav_index.refresh()
+
+	@property
+	def _nav_categories(self):
+		return self._nav_index.categories if self._nav_index else []
 
 	def _get_filtered_links(self):
+		if not self._nav_index:
+			return []
 		if self._nav_cat_index < 0 or self._nav_cat_index >= len(self._nav_categories):
-			return self._nav_links
-		selected_cat = self._nav_categories[self._nav_cat_index]
-		return [(t, u, c) for t, u, c in self._nav_links if selected_cat == c]
+			return self._nav_index.get_links()
+		return self._nav_index.get_links(self._nav_categories[self._nav_cat_index])
 
 	@script(
 		# Translators: Descripción del script para ir al enlace siguiente.
@@ -251,7 +304,7 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		if self._nav_cat_index >= len(self._nav_categories):
 			self._nav_cat_index = len(self._nav_categories) - 1
 		cat_name = self._nav_categories[self._nav_cat_index]
-		count = sum(1 for _t, _u, c in self._nav_links if cat_name == c)
+		count = self._nav_index.get_count(cat_name)
 		# Translators: Se anuncia la categoría con su posición y cantidad de enlaces.
 		ui.message(_("{name}, {count} enlaces, {pos} de {total}").format(
 			name=cat_name, count=count, pos=self._nav_cat_index + 1, total=len(self._nav_categories)
@@ -274,9 +327,71 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		if self._nav_cat_index < 0:
 			self._nav_cat_index = 0
 		cat_name = self._nav_categories[self._nav_cat_index]
-		count = sum(1 for _t, _u, c in self._nav_links if cat_name == c)
+		count = self._nav_index.get_count(cat_name)
 		# Translators: Se anuncia la categoría con su posición y cantidad de enlaces.
 		ui.message(_("{name}, {count} enlaces, {pos} de {total}").format(
 			name=cat_name, count=count, pos=self._nav_cat_index + 1, total=len(self._nav_categories)
 		))
 		self._nav_link_index = -1
+
+	@script(
+		# Translators: Descripción del script para activar o desactivar la medición de tiempos.
+		description=_("Activa o desactiva la medición de tiempos de la base de datos"),
+		gesture=None,
+		category=_("Gestor De Enlaces")
+	)
+	def script_toggle_db_stats(self, gesture):
+		if not self._db_manager:
+			# Translators: Error cuando la base de datos no pudo inicializarse.
+			ui.message(_("Error: la base de datos no se pudo inicializar."))
+			return
+		if self._db_stats.toggle():
+			# Translators: Mensaje al activar la medición de tiempos.
+			ui.message(_("Medición de tiempos activada"))
+		else:
+			# Translators: Mensaje al desactivar la medición de tiempos.
+			ui.message(_("Medición de tiempos desactivada"))
+
+	@script(
+		# Translators: Descripción del script que anuncia y copia el resumen de tiempos.
+		description=_("Anuncia y copia al portapapeles el resumen de tiempos de la base de datos"),
+		gesture=None,
+		category=_("Gestor De Enlaces")
+	)
+	def script_report_db_stats(self, gesture):
+		if not self._db_manager:
+			# Translators: Error cuando la base de datos no pudo inicializarse.
+			ui.message(_("Error: la base de datos no se pudo inicializar."))
+			return
+		summary = self._db_stats.summary()
+		if not self._db_stats.enabled:
+			# Translators: Se añade al resumen cuando la medición está desactivada.
+			summary = _("Medición desactivada.") + "\n" + summary
+		api.copyToClip(summary)
+		ui.message(summary)
+
+	@script(
+		# Translators: Descripción del script que inicia o detiene la captura de un perfil de rendimiento.
+		description=_("Inicia o detiene la captura de un perfil de rendimiento"),
+		gesture=None,
+		category=_("Gestor De Enlaces")
+	)
+	def script_toggle_profiler(self, gesture):
+		if not self._profiler.running:
+			self._profiler.start()
+			# Translators: Mensaje al iniciar la captura del perfil.
+			ui.message(_("Perfil iniciado"))
+			return
+		try:
+			base_path, top = self._profiler.stop()
+		except Exception as e:
+			from logHandler import log
+			log.error(f"Gestor de Enlaces: Error al guardar el perfil: {e}", exc_info=True)
+			# Translators: Mensaje cuando no se pudo guardar el perfil.
+			ui.message(_("Error al guardar el perfil"))
+			return
+		from logHandler import log
+		log.info(f"Gestor de Enlaces: Perfil guardado en {base_path}.prof y {base_path}.folded")
+		functions = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in top)
+		# Translators: Mensaje al detener el perfil; {functions} son las funciones que más tiempo ocuparon.
+		ui.message(_("Perfil guardado. Funciones más costosas: {functions}").format(functions=functions or "-"))
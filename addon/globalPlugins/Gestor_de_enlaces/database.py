@@ -5,8 +5,14 @@
 # Copyright (C) 2024 Ayoub El Bakhti
 
 import os
+import re
+import codecs
 import sys
 import json
+import math
+import threading
+import time
+import unicodedata
 
 dirAddon = os.path.dirname(__file__)
 sys.path.append(dirAddon)
@@ -28,23 +34,346 @@ del sys.path[-3:]
 
 UNCATEGORIZED = "Sin categoría"
 
+FTS_TRIGGERS = ("items_fts_ai", "items_fts_au", "items_fts_ad", "categories_fts_au")
+
+# Índice FTS5 con el tokenizador trigram, que encuentra subcadenas ("hub" en "GitHub") sin recorrer la tabla.
+# El tokenizador apareció en SQLite 3.34; la versión de lib/_37 es anterior y allí solo se buscan prefijos.
+TRIGRAM_FTS_MIN_SQLITE = (3, 34, 0)
+TRIGRAM_FTS_TRIGGERS = (
+	"items_trigram_fts_ai", "items_trigram_fts_au", "items_trigram_fts_ad", "categories_trigram_fts_au",
+)
+# Los trigramas no encuentran nada más corto.
+TRIGRAM_MIN_TERM_LENGTH = 3
+
+# Un índice por cada combinación de filtro y orden que puede pedir get_items.
+INDEXES = (
+	("idx_items_title", "items (title COLLATE NOCASE)"),
+	("idx_items_created", "items (created_at)"),
+	("idx_items_usage", "items (usage_count DESC, title COLLATE NOCASE)"),
+	("idx_items_type_title", "items (type, title COLLATE NOCASE)"),
+	("idx_items_type_created", "items (type, created_at)"),
+	("idx_items_type_usage", "items (type, usage_count DESC, title COLLATE NOCASE)"),
+	("idx_items_category_title", "items (category_id, title COLLATE NOCASE)"),
+	("idx_items_category_created", "items (category_id, created_at)"),
+	("idx_items_category_usage", "items (category_id, usage_count DESC, title COLLATE NOCASE)"),
+	("idx_categories_name", "categories (name COLLATE NOCASE)"),
+)
+
+# Índices del orden por frecuencia y recencia; se crean en su propia migración, junto con la columna.
+FRECENCY_INDEXES = (
+	("idx_items_frecency", "items (frecency DESC, title COLLATE NOCASE)"),
+	("idx_items_type_frecency", "items (type, frecency DESC, title COLLATE NOCASE)"),
+	("idx_items_category_frecency", "items (category_id, frecency DESC, title COLLATE NOCASE)"),
+)
+# Cada uso pierde la mitad de su peso en este tiempo.
+FRECENCY_HALF_LIFE = 14 * 24 * 60 * 60.0
+FRECENCY_TAU = FRECENCY_HALF_LIFE / math.log(2)
+# usage_events solo guarda los usos de este periodo, en el que aún pesan más de una milésima.
+USAGE_EVENTS_MAX_AGE = 10 * FRECENCY_HALF_LIFE
+
+# Los títulos se indexan por trigramas hasta esta longitud.
+TRIGRAM_MAX_TITLE_LENGTH = 256
+# Del término de la búsqueda aproximada solo cuentan los trigramas de estos primeros caracteres:
+# cada uno es una subconsulta y SQLite admite 500 por consulta compuesta.
+FUZZY_MAX_TERM_LENGTH = 64
+# Candidatos que la búsqueda aproximada saca de SQLite antes de puntuarlos en Python.
+FUZZY_CANDIDATES = 200
+# Parte mínima de los trigramas del término que debe compartir un título para aparecer.
+FUZZY_MIN_SIMILARITY = 0.3
+
+# Filas de la copia por cada INSERT ... SELECT al restaurarla.
+MERGE_CHUNK_SIZE = 5000
+
+# Parámetros por consulta IN al comprobar duplicados en altas masivas; SQLite antiguo admite 999.
+BULK_LOOKUP_CHUNK_SIZE = 500
+
+# Entradas de links.json por transacción al migrar, y ajuste donde se guarda el avance.
+JSON_MIGRATION_BATCH_SIZE = 500
+JSON_MIGRATION_KEY = "json_migration_progress"
+
+# Ajustes que solo valen para la base de datos que los guardó y no se copian al restaurar:
+# el id del último elemento enfocado y el avance de una migración a medias.
+TRANSIENT_SETTINGS = ("last_focused", JSON_MIGRATION_KEY)
+
+# Páginas que copia cada paso de backup_to() antes de avisar del progreso.
+BACKUP_PAGES_PER_STEP = 1024
+
+# Segundos que esperan las escrituras diferidas (foco, contadores de uso) antes de volcarse.
+WRITE_BEHIND_DELAY = 2.0
+
+# Pragmas que se aplican a cada conexión, también tras reconnect().
+CONNECTION_PROFILE = {
+	"journal_mode": "WAL",
+	"synchronous": "NORMAL",
+	"mmap_size": 64 * 1024 * 1024,
+	# Valores negativos: tamaño en KiB en lugar de páginas.
+	"cache_size": -8192,
+	"temp_store": "MEMORY",
+	"busy_timeout": 5000,
+}
+
+_fts_token_re = re.compile(r"[^\W_]+")
+
+# Columna fuzzy de items_trigram_fts: el título con dos espacios delante de cada palabra y uno detrás.
+# _pad_for_trigrams hace lo mismo en Python; el tokenizador trigram ya ignora mayúsculas y minúsculas.
+_TRIGRAM_PADDING_SQL = f"('  ' || replace(substr({{0}}, 1, {TRIGRAM_MAX_TITLE_LENGTH}), ' ', '  ') || ' ')"
+
+# LIKE de SQLite solo ignora mayúsculas y minúsculas en ASCII.
+_ASCII_LOWER = {c: c + 32 for c in range(ord("A"), ord("Z") + 1)}
+
+
+def _fold_for_fts(text):
+	# Aproxima el tokenizador unicode61: minúsculas y sin diacríticos.
+	text = text.lower()
+	if text.isascii():
+		return text
+	return "".join(c for c in unicodedata.normalize("NFD", text) if not unicodedata.combining(c))
+
+
+def _frecency_add(frecency, used_at):
+	# frecency = τ·ln(Σ e^(t/τ)) sobre los instantes t de uso. Comparar este valor equivale a comparar
+	# Σ e^((t - ahora)/τ), así que el decaimiento no necesita recalcularse nunca.
+	# La suma se hace en escala logarítmica para no desbordar.
+	if frecency is None:
+		return used_at
+	high = max(frecency, used_at)
+	low = min(frecency, used_at)
+	return high + FRECENCY_TAU * math.log1p(math.exp((low - high) / FRECENCY_TAU))
+
+
+def connect(db_path, profile=None):
+	if profile is None:
+		profile = CONNECTION_PROFILE
+	conn = sqlite3.connect(db_path, check_same_thread=False)
+	conn.create_function("frecency_add", 2, _frecency_add)
+	conn.execute("PRAGMA foreign_keys = ON")
+	for pragma, value in profile.items():
+		conn.execute(f"PRAGMA {pragma} = {value}")
+	return conn
+
+
+def _pad_for_trigrams(text):
+	return "  " + text.lower().replace(" ", "  ") + " "
+
+
+def _fuzzy_score(term, title, trigram_similarity, usage_count):
+	# Parecido por trigramas (0..1), más un extra si el término aparece entero (sobre todo al inicio
+	# de una palabra) o como subsecuencia del título, más un pequeño impulso por uso.
+	score = trigram_similarity
+	if term in title:
+		score += 1.0
+		if title.startswith(term) or f" {term}" in title:
+			score += 0.25
+	else:
+		position = 0
+		for char in term:
+			position = title.find(char, position) + 1
+			if not position:
+				break
+		else:
+			score += 0.5
+	return score + 0.1 * math.log1p(usage_count)
+
+
+def _legacy_json_item(title, item_data):
+	# Convierte una entrada del antiguo links.json en (title, value, type, category); None si no sirve.
+	value = ""
+	item_type = "url"
+	category = UNCATEGORIZED
+
+	if isinstance(item_data, str):
+		value = item_data
+	elif isinstance(item_data, dict):
+		value = item_data.get("url", item_data.get("path", ""))
+		if "path" in item_data and "url" not in item_data:
+			item_type = "path"
+		cats = item_data.get("categories", [])
+		if isinstance(cats, list) and cats:
+			category = cats[0]
+		elif isinstance(cats, str) and cats:
+			category = cats
+	else:
+		return None
+
+	if not value:
+		return None
+	return (title, value, item_type, category)
+
+
+class _JsonObjectReader:
+	"""Recorre los pares clave/valor de un objeto JSON de primer nivel sin cargar el archivo entero.
+
+	tell() devuelve el byte tras el último par entregado; pasándolo como offset se reanuda la lectura.
+	"""
+
+	_whitespace_re = re.compile(r"[ \t\n\r]*")
+	# Lo que aún podría continuar un número: "-1." también se lee como -1 y "1e" como 1.
+	_number_tail_re = re.compile(r"[0-9.eE+\-]*")
+
+	def __init__(self, f, offset=0, chunk_size=64 * 1024):
+		self._file = f
+		self._chunk_size = chunk_size
+		self._decoder = json.JSONDecoder()
+		self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+		self._buffer = ""
+		self._pos = 0
+		self._eof = False
+		self._resumed = offset > 0
+		f.seek(offset)
+		self._base_offset = offset
+
+	def tell(self):
+		return self._base_offset + len(self._buffer[:self._pos].encode("utf-8"))
+
+	def _read_more(self, size=None):
+		if self._eof:
+			return False
+		data = self._file.read(size or self._chunk_size)
+		if not data:
+			self._eof = True
+			self._buffer += self._text_decoder.decode(b"", final=True)
+			return False
+		# Se descarta lo ya consumido para que el búfer no crezca con el archivo.
+		self._base_offset += len(self._buffer[:self._pos].encode("utf-8"))
+		self._buffer = self._buffer[self._pos:] + self._text_decoder.decode(data)
+		self._pos = 0
+		return True
+
+	def _next_char(self):
+		while True:
+			self._pos = self._whitespace_re.match(self._buffer, self._pos).end()
+			if self._pos < len(self._buffer):
+				return self._buffer[self._pos]
+			if not self._read_more():
+				raise ValueError("Fin inesperado del archivo JSON")
+
+	def _decode_value(self):
+		self._next_char()
+		while True:
+			try:
+				value, end = self._decoder.raw_decode(self._buffer, self._pos)
+			except ValueError:
+				end = None
+			# Un número seguido solo de caracteres que podrían continuarlo puede estar cortado por el final
+			# del búfer; el resto de valores cortados no se llegan a decodificar.
+			if end is not None and (self._eof or not self._is_cut_number(value, end)):
+				self._pos = end
+				return value
+			if not self._read_more(max(self._chunk_size, len(self._buffer))):
+				if end is None:
+					raise ValueError("JSON mal formado")
+				self._pos = end
+				return value
+
+	def _is_cut_number(self, value, end):
+		if isinstance(value, bool) or not isinstance(value, (int, float)):
+			return False
+		return self._number_tail_re.match(self._buffer, end).end() == len(self._buffer)
+
+	def __iter__(self):
+		if not self._resumed:
+			if self._next_char() != "{":
+				raise ValueError("links.json no contiene un objeto JSON")
+			self._pos += 1
+			if self._next_char() == "}":
+				return
+		else:
+			char = self._next_char()
+			self._pos += 1
+			if char == "}":
+				return
+			if char != ",":
+				raise ValueError("Posición de reanudación no válida")
+		while True:
+			key = self._decode_value()
+			if not isinstance(key, str) or self._next_char() != ":":
+				raise ValueError("JSON mal formado")
+			self._pos += 1
+			value = self._decode_value()
+			# El separador se comprueba antes de entregar el par: en un archivo cortado, "12" puede haber
+			# llegado solo como "1".
+			char = self._next_char()
+			if char not in ",}":
+				raise ValueError("JSON mal formado")
+			yield key, value
+			self._pos += 1
+			if char == "}":
+				return
+
 
 class DatabaseManager:
-	def __init__(self, db_path):
+	def __init__(self, db_path, profile=None):
 		self.db_path = db_path
-		self.conn = sqlite3.connect(db_path, check_same_thread=False)
-		self.conn.execute("PRAGMA foreign_keys = ON")
-		self.create_tables()
-		self._add_usage_count_column()
-		self.add_category(UNCATEGORIZED)
+		self.profile = dict(CONNECTION_PROFILE)
+		if profile:
+			self.profile.update(profile)
+		self.conn = connect(db_path, self.profile)
+		self._lock = threading.RLock()
+		# Protege solo las escrituras diferidas, la copia de settings y el temporizador, para que el hilo
+		# de la interfaz pueda anotarlas mientras otra operación larga (una restauración) tiene _lock.
+		# Quien necesite los dos toma antes _lock.
+		self._pending_lock = threading.Lock()
+		self._pending_settings = {}
+		# Copia en memoria de la tabla settings; se carga en la primera lectura.
+		self._settings = None
+		self._pending_usage = {}
+		self._flush_timer = None
+		# Aumenta con cada cambio en elementos o categorías; permite a las cachés saber si siguen vigentes.
+		self.change_counter = 0
+		self._migrate()
+
+	def _commit(self):
+		self.conn.commit()
+		self.change_counter += 1
 
-	def _add_usage_count_column(self):
+	def _get_migrations(self):
+		# El paso N lleva la base de datos a PRAGMA user_version = N; solo se añaden pasos al final.
+		return (
+			self.create_tables,
+			self._create_indexes,
+			self._create_trigram_index,
+			self._add_path_health,
+			self._add_frecency,
+			self._recreate_category_triggers,
+			self._pad_trigrams,
+			self._index_item_values,
+			self._index_broken_by_category,
+			self._drop_item_trigrams,
+			self._index_usage_event_times,
+		)
+
+	def _migrate(self):
 		cursor = self.conn.cursor()
+		cursor.execute("SELECT user_version FROM pragma_user_version")
+		version = cursor.fetchone()[0]
+		migrations = self._get_migrations()
+		for target_version in range(version + 1, len(migrations) + 1):
+			self._run_in_transaction(self._apply_migration, migrations[target_version - 1], target_version)
+		# Después de las migraciones, que pueden quitar los triggers para que el índice se rehaga.
+		cursor.execute(
+			"SELECT sqlite_compileoption_used('ENABLE_FTS5'), "
+			"EXISTS (SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?), "
+			"EXISTS (SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?)",
+			(FTS_TRIGGERS[0], TRIGRAM_FTS_TRIGGERS[0])
+		)
+		fts_available, fts_installed, trigram_installed = cursor.fetchone()
+		self._sync_fts_index(bool(fts_available), bool(fts_installed))
+		trigram_available = bool(fts_available) and sqlite3.sqlite_version_info >= TRIGRAM_FTS_MIN_SQLITE
+		self._sync_trigram_fts_index(trigram_available, bool(trigram_installed))
+
+	def _apply_migration(self, migration, target_version):
+		migration()
+		self.conn.execute(f"PRAGMA user_version = {target_version:d}")
+
+	def _run_in_transaction(self, func, *args):
+		self.conn.execute("BEGIN")
 		try:
-			cursor.execute("SELECT usage_count FROM items LIMIT 1")
-		except sqlite3.OperationalError:
-			cursor.execute("ALTER TABLE items ADD COLUMN usage_count INTEGER NOT NULL DEFAULT 0")
+			result = func(*args)
 			self.conn.commit()
+		except Exception:
+			self.conn.rollback()
+			raise
+		return result
 
 	def create_tables(self):
 		cursor = self.conn.cursor()
@@ -62,6 +391,7 @@ class DatabaseManager:
 				type TEXT NOT NULL,
 				category_id INTEGER,
 				created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+				usage_count INTEGER NOT NULL DEFAULT 0,
 				FOREIGN KEY (category_id) REFERENCES categories (id) ON DELETE SET NULL
 			)
 		''')
@@ -71,69 +401,439 @@ class DatabaseManager:
 				value TEXT
 			)
 		''')
-		self.conn.commit()
+		# Bases de datos anteriores a la columna usage_count.
+		cursor.execute("SELECT 1 FROM pragma_table_info('items') WHERE name = 'usage_count'")
+		if cursor.fetchone() is None:
+			cursor.execute("ALTER TABLE items ADD COLUMN usage_count INTEGER NOT NULL DEFAULT 0")
+		cursor.execute("INSERT OR IGNORE INTO categories (name) VALUES (?)", (UNCATEGORIZED,))
 
-	def get_category_id(self, name, create_if_not_exists=False):
+	def _create_indexes(self):
 		cursor = self.conn.cursor()
-		cursor.execute("SELECT id FROM categories WHERE name = ?", (name,))
-		result = cursor.fetchone()
-		if result:
-			return result[0]
-		if create_if_not_exists:
-			cursor.execute("INSERT OR IGNORE INTO categories (name) VALUES (?)", (name,))
-			self.conn.commit()
-			return cursor.lastrowid
-		return None
+		for name, definition in INDEXES:
+			cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+		self._create_category_triggers()
+		cursor.execute(
+			"UPDATE items SET category_id = (SELECT id FROM categories WHERE name = ?) "
+			"WHERE category_id IS NULL",
+			(UNCATEGORIZED,)
+		)
 
-	def get_all_categories(self):
+	def _create_category_triggers(self):
+		# get_items une items y categories con JOIN para que los órdenes por categoría usen índices,
+		# así que ningún elemento puede quedarse sin categoría.
+		# Dentro de un trigger manda la política de conflicto de la sentencia externa (UPDATE OR ROLLBACK...)
+		# y no el OR IGNORE propio, así que la categoría solo se crea si no existe.
 		cursor = self.conn.cursor()
-		cursor.execute("SELECT name FROM categories ORDER BY name COLLATE NOCASE ASC")
-		return [row[0] for row in cursor.fetchall()]
+		for event in ("INSERT", "UPDATE OF category_id"):
+			trigger_name = "items_category_ai" if event == "INSERT" else "items_category_au"
+			cursor.execute(f'''
+				CREATE TRIGGER IF NOT EXISTS {trigger_name} AFTER {event} ON items
+				WHEN new.category_id IS NULL BEGIN
+					INSERT INTO categories (name) SELECT '{UNCATEGORIZED}'
+					WHERE NOT EXISTS (SELECT 1 FROM categories WHERE name = '{UNCATEGORIZED}');
+					UPDATE items SET category_id = (SELECT id FROM categories WHERE name = '{UNCATEGORIZED}')
+					WHERE id = new.id;
+				END
+			''')
 
-	def add_category(self, name):
+	def _recreate_category_triggers(self):
 		cursor = self.conn.cursor()
-		cursor.execute("INSERT OR IGNORE INTO categories (name) VALUES (?)", (name,))
-		self.conn.commit()
+		cursor.execute("DROP TRIGGER IF EXISTS items_category_ai")
+		cursor.execute("DROP TRIGGER IF EXISTS items_category_au")
+		self._create_category_triggers()
 
-	def rename_category(self, old_name, new_name):
+	def _create_trigram_index(self):
+		# Antigua tabla item_trigrams de la búsqueda aproximada; la sustituye la columna fuzzy de
+		# items_trigram_fts y _drop_item_trigrams la borra. El paso se conserva para no mover la numeración.
+		pass
+
+	def _pad_trigrams(self):
+		# Rellenaba item_trigrams con los títulos con espacios; ahora lo hace la columna fuzzy.
+		pass
+
+	def _index_item_values(self):
+		# Lo usan las comprobaciones de duplicados por valor de add_items; sin él recorren toda la tabla.
+		# No es UNIQUE: las bases de datos existentes pueden tener valores repetidos.
+		self.conn.execute("CREATE INDEX IF NOT EXISTS idx_items_value ON items (value)")
+
+	def _index_broken_by_category(self):
+		# Rutas rotas por categoría: sirve el filtro de rotas con los órdenes por categoría sin ordenar aparte.
+		self.conn.execute(
+			"CREATE INDEX IF NOT EXISTS idx_items_broken_category ON items (category_id, title COLLATE NOCASE) "
+			"WHERE path_ok = 0"
+		)
+
+	def _drop_item_trigrams(self):
+		# items_trigram_fts lleva ahora la columna fuzzy y sustituye a item_trigrams, unas 60 filas por
+		# elemento más su índice. Sin sus triggers, _sync_trigram_fts_index rehace la tabla con la columna.
 		cursor = self.conn.cursor()
-		cursor.execute("UPDATE categories SET name = ? WHERE name = ?", (new_name, old_name))
-		self.conn.commit()
+		for name in ("items_trigrams_ai", "items_trigrams_au", "items_trigrams_ad") + TRIGRAM_FTS_TRIGGERS:
+			cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+		cursor.execute("DROP TABLE IF EXISTS item_trigrams")
+		cursor.execute("DROP TABLE IF EXISTS trigram_positions")
 
-	def delete_category(self, name, default_category=None):
-		if default_category is None:
-			default_category = UNCATEGORIZED
-		default_cat_id = self.get_category_id(default_category, create_if_not_exists=True)
-		cat_to_delete_id = self.get_category_id(name)
-		if not cat_to_delete_id:
-			return
+	def _index_usage_event_times(self):
+		# Para borrar los usos antiguos en cada volcado sin recorrer toda la tabla.
+		self.conn.execute("CREATE INDEX IF NOT EXISTS idx_usage_events_used_at ON usage_events (used_at)")
+
+	def _add_path_health(self):
+		# path_ok: 1 existe, 0 rota, NULL sin comprobar. checked_at: time.time() de la última comprobación.
 		cursor = self.conn.cursor()
-		cursor.execute("UPDATE items SET category_id = ? WHERE category_id = ?", (default_cat_id, cat_to_delete_id))
-		cursor.execute("DELETE FROM categories WHERE id = ?", (cat_to_delete_id,))
-		self.conn.commit()
+		cursor.execute("ALTER TABLE items ADD COLUMN path_ok INTEGER")
+		cursor.execute("ALTER TABLE items ADD COLUMN checked_at REAL")
+		# Índice parcial: solo contiene las rutas rotas, que son pocas, y sirve el filtro ordenado por título.
+		# path_ok solo se rellena en elementos de tipo ruta; update_item lo borra si cambia el tipo o el valor.
+		cursor.execute(
+			"CREATE INDEX IF NOT EXISTS idx_items_broken_paths ON items (title COLLATE NOCASE) WHERE path_ok = 0"
+		)
+		# Las nunca comprobadas (NULL) salen primero y después las más antiguas.
+		cursor.execute("CREATE INDEX IF NOT EXISTS idx_items_path_checked ON items (type, checked_at)")
 
-	def add_item(self, title, value, item_type, category_name):
-		cat_id = self.get_category_id(category_name, create_if_not_exists=True)
+	def _add_frecency(self):
 		cursor = self.conn.cursor()
+		cursor.execute('''
+			CREATE TABLE IF NOT EXISTS usage_events (
+				id INTEGER PRIMARY KEY,
+				item_id INTEGER NOT NULL,
+				used_at REAL NOT NULL,
+				FOREIGN KEY (item_id) REFERENCES items (id) ON DELETE CASCADE
+			)
+		''')
+		cursor.execute("CREATE INDEX IF NOT EXISTS idx_usage_events_item ON usage_events (item_id, used_at)")
+		# NULL: nunca usado; queda al final en el orden descendente.
+		cursor.execute("ALTER TABLE items ADD COLUMN frecency REAL")
+		# Sin historial previo, los usos acumulados se cuentan como hechos el día en que se creó el elemento.
 		cursor.execute(
-			"INSERT INTO items (title, value, type, category_id) VALUES (?, ?, ?, ?)",
-			(title, value, item_type, cat_id)
+			"SELECT id, usage_count, CAST(strftime('%s', created_at) AS REAL) FROM items WHERE usage_count > 0"
 		)
-		self.conn.commit()
+		cursor.executemany(
+			"UPDATE items SET frecency = ? WHERE id = ?",
+			[
+				((created or 0.0) + FRECENCY_TAU * math.log(usage_count), item_id)
+				for item_id, usage_count, created in cursor.fetchall()
+			]
+		)
+		for name, definition in FRECENCY_INDEXES:
+			cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
 
-	def update_item(self, old_title, new_title, value, item_type, category_name):
-		cat_id = self.get_category_id(category_name, create_if_not_exists=True)
+	def _sync_fts_index(self, available, installed):
+		if available and not installed:
+			self._run_in_transaction(self._create_fts_index)
+		elif installed and not available:
+			# Sin FTS5 los triggers harían fallar cualquier escritura en items.
+			self._run_in_transaction(self._drop_fts_triggers)
+		self.fts_enabled = available
+
+	def _create_fts_index(self):
+		cursor = self.conn.cursor()
+		cursor.execute("DROP TABLE IF EXISTS items_fts")
+		cursor.execute("CREATE VIRTUAL TABLE items_fts USING fts5(title, value, category)")
+		self._create_fts_insert_trigger()
+		cursor.execute('''
+			CREATE TRIGGER items_fts_au AFTER UPDATE OF title, value, category_id ON items BEGIN
+				UPDATE items_fts SET
+					title = new.title,
+					value = new.value,
+					category = (SELECT name FROM categories WHERE id = new.category_id)
+				WHERE rowid = old.id;
+			END
+		''')
+		cursor.execute('''
+			CREATE TRIGGER items_fts_ad AFTER DELETE ON items BEGIN
+				DELETE FROM items_fts WHERE rowid = old.id;
+			END
+		''')
+		cursor.execute('''
+			CREATE TRIGGER categories_fts_au AFTER UPDATE OF name ON categories BEGIN
+				UPDATE items_fts SET category = new.name
+				WHERE rowid IN (SELECT id FROM items WHERE category_id = new.id);
+			END
+		''')
+		self._fill_fts_index()
+
+	def _create_fts_insert_trigger(self):
+		self.conn.execute('''
+			CREATE TRIGGER items_fts_ai AFTER INSERT ON items BEGIN
+				INSERT INTO items_fts (rowid, title, value, category)
+				VALUES (new.id, new.title, new.value, (SELECT name FROM categories WHERE id = new.category_id));
+			END
+		''')
+
+	def _fill_fts_index(self, after_id=0):
+		self.conn.execute(
+			"INSERT INTO items_fts (rowid, title, value, category) "
+			"SELECT i.id, i.title, i.value, c.name "
+			"FROM items i LEFT JOIN categories c ON i.category_id = c.id WHERE i.id > ?",
+			(after_id,)
+		)
+
+	def _drop_fts_triggers(self):
 		cursor = self.conn.cursor()
+		for name in FTS_TRIGGERS:
+			cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+	def _sync_trigram_fts_index(self, available, installed):
+		# Como _sync_fts_index: la versión de SQLite depende de la de Python con la que arranca NVDA.
+		if available and not installed:
+			self._run_in_transaction(self._create_trigram_fts_index)
+		elif installed and not available:
+			self._run_in_transaction(self._drop_trigram_fts_triggers)
+		self.trigram_fts_enabled = available
+
+	def _create_trigram_fts_index(self):
+		# fuzzy guarda el título rellenado con espacios para la búsqueda aproximada; las demás columnas,
+		# las subcadenas de la búsqueda normal.
+		cursor = self.conn.cursor()
+		cursor.execute("DROP TABLE IF EXISTS items_trigram_fts")
 		cursor.execute(
-			"UPDATE items SET title=?, value=?, type=?, category_id=? WHERE title=?",
-			(new_title, value, item_type, cat_id, old_title)
+			"CREATE VIRTUAL TABLE items_trigram_fts USING fts5(title, value, category, fuzzy, tokenize = 'trigram')"
 		)
-		self.conn.commit()
+		self._create_trigram_fts_insert_trigger()
+		padded = _TRIGRAM_PADDING_SQL.format("new.title")
+		cursor.execute(f'''
+			CREATE TRIGGER items_trigram_fts_au AFTER UPDATE OF title, value, category_id ON items BEGIN
+				UPDATE items_trigram_fts SET
+					title = new.title,
+					value = new.value,
+					category = (SELECT name FROM categories WHERE id = new.category_id),
+					fuzzy = {padded}
+				WHERE rowid = old.id;
+			END
+		''')
+		cursor.execute('''
+			CREATE TRIGGER items_trigram_fts_ad AFTER DELETE ON items BEGIN
+				DELETE FROM items_trigram_fts WHERE rowid = old.id;
+			END
+		''')
+		cursor.execute('''
+			CREATE TRIGGER categories_trigram_fts_au AFTER UPDATE OF name ON categories BEGIN
+				UPDATE items_trigram_fts SET category = new.name
+				WHERE rowid IN (SELECT id FROM items WHERE category_id = new.id);
+			END
+		''')
+		self._fill_trigram_fts_index()
+
+	def _create_trigram_fts_insert_trigger(self):
+		self.conn.execute(f'''
+			CREATE TRIGGER items_trigram_fts_ai AFTER INSERT ON items BEGIN
+				INSERT INTO items_trigram_fts (rowid, title, value, category, fuzzy)
+				VALUES (
+					new.id, new.title, new.value, (SELECT name FROM categories WHERE id = new.category_id),
+					{_TRIGRAM_PADDING_SQL.format("new.title")}
+				);
+			END
+		''')
 
-	def delete_item(self, title):
+	def _fill_trigram_fts_index(self, after_id=0):
+		self.conn.execute(
+			"INSERT INTO items_trigram_fts (rowid, title, value, category, fuzzy) "
+			f"SELECT i.id, i.title, i.value, c.name, {_TRIGRAM_PADDING_SQL.format('i.title')} "
+			"FROM items i LEFT JOIN categories c ON i.category_id = c.id WHERE i.id > ?",
+			(after_id,)
+		)
+
+	def _insert_items_in_bulk(self, insert, *args):
+		# Los triggers de alta de los índices FTS5 cuestan bastante más por fila que llenarlos después con
+		# una sola sentencia, así que se quitan mientras insert() añade elementos y se vuelven a crear tras
+		# indexar los nuevos (id mayor que el último). Todo va en la transacción del llamador, que hace
+		# COMMIT o ROLLBACK: si algo falla, los triggers vuelven con el ROLLBACK.
+		if not self.conn.in_transaction:
+			self.conn.execute("BEGIN")
+		indexes = []
+		if self.fts_enabled:
+			indexes.append(("items_fts_ai", self._fill_fts_index, self._create_fts_insert_trigger))
+		if self.trigram_fts_enabled:
+			indexes.append(
+				("items_trigram_fts_ai", self._fill_trigram_fts_index, self._create_trigram_fts_insert_trigger)
+			)
 		cursor = self.conn.cursor()
-		cursor.execute("DELETE FROM items WHERE title=?", (title,))
-		self.conn.commit()
+		cursor.execute("SELECT COALESCE(MAX(id), 0) FROM items")
+		last_id = cursor.fetchone()[0]
+		for trigger, _fill, _create in indexes:
+			cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+		result = insert(*args)
+		for _trigger, fill, create in indexes:
+			fill(last_id)
+			create()
+		return result
+
+	def _drop_trigram_fts_triggers(self):
+		cursor = self.conn.cursor()
+		for name in TRIGRAM_FTS_TRIGGERS:
+			cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+	def get_search_kind(self, search_term, search_mode='fts'):
+		if not search_term:
+			return None
+		if search_mode == 'fuzzy' and len(search_term) >= 3 and self.trigram_fts_enabled:
+			return 'fuzzy'
+		# Sin el tokenizador trigram (lib/_37) la búsqueda aproximada se queda en la de prefijos.
+		if search_mode in ('fts', 'fuzzy') and self.fts_enabled and _fts_token_re.search(search_term):
+			# 'fts' busca prefijos de palabra; 'substring' además subcadenas, con el índice de trigramas.
+			if self.trigram_fts_enabled and len(search_term) >= TRIGRAM_MIN_TERM_LENGTH:
+				return 'substring'
+			return 'fts'
+		return 'like'
+
+	def get_search_matcher(self, search_term, search_mode='fts'):
+		# Reproduce en memoria el filtro de búsqueda de get_items sobre sus filas (id, título, categoría, valor).
+		kind = self.get_search_kind(search_term, search_mode)
+		# LIKE solo ignora mayúsculas en ASCII; el tokenizador trigram, en todo Unicode.
+		fold = str.lower if kind == 'substring' else (lambda text: text.translate(_ASCII_LOWER))
+		needle = fold(search_term)
+
+		def contains(row):
+			return any(needle in fold(field or "") for field in (row[1], row[3], row[2]))
+
+		if kind not in ('fts', 'substring'):
+			return contains
+		patterns = [
+			re.compile(r"(?:^|[\W_])" + re.escape(_fold_for_fts(token)))
+			for token in _fts_token_re.findall(search_term)
+		]
+
+		def matches(row):
+			if kind == 'substring' and contains(row):
+				return True
+			text = _fold_for_fts(" ".join((row[1], row[3], row[2] or "")))
+			return all(pattern.search(text) for pattern in patterns)
+		return matches
+
+	@staticmethod
+	def _fts_match_query(search_term):
+		tokens = _fts_token_re.findall(search_term)
+		if not tokens:
+			return None
+		return " ".join(f'"{token}"*' for token in tokens)
+
+	@staticmethod
+	def _trigram_match_query(search_term, columns="title value category"):
+		# Una frase con el término entero: equivale a buscarlo como subcadena en cualquiera de las columnas.
+		return '{{{0}}}: "{1}"'.format(columns, search_term.replace('"', '""'))
+
+	def get_category_id(self, name, create_if_not_exists=False):
+		with self._lock:
+			cursor = self.conn.cursor()
+			cursor.execute("SELECT id FROM categories WHERE name = ?", (name,))
+			result = cursor.fetchone()
+			if result:
+				return result[0]
+			if create_if_not_exists:
+				cursor.execute("INSERT OR IGNORE INTO categories (name) VALUES (?)", (name,))
+				self._commit()
+				return cursor.lastrowid
+			return None
+
+	def get_all_categories(self):
+		cursor = self.conn.cursor()
+		cursor.execute("SELECT name FROM categories ORDER BY name COLLATE NOCASE ASC")
+		return [row[0] for row in cursor.fetchall()]
+
+	def add_category(self, name):
+		with self._lock:
+			cursor = self.conn.cursor()
+			cursor.execute("INSERT OR IGNORE INTO categories (name) VALUES (?)", (name,))
+			self._commit()
+
+	def rename_category(self, old_name, new_name):
+		with self._lock:
+			cursor = self.conn.cursor()
+			cursor.execute("UPDATE categories SET name = ? WHERE name = ?", (new_name, old_name))
+			self._commit()
+
+	def delete_category(self, name, default_category=None):
+		with self._lock:
+			if default_category is None:
+				default_category = UNCATEGORIZED
+			default_cat_id = self.get_category_id(default_category, create_if_not_exists=True)
+			cat_to_delete_id = self.get_category_id(name)
+			if not cat_to_delete_id:
+				return
+			cursor = self.conn.cursor()
+			cursor.execute(
+				"UPDATE items SET category_id = ? WHERE category_id = ?", (default_cat_id, cat_to_delete_id)
+			)
+			cursor.execute("DELETE FROM categories WHERE id = ?", (cat_to_delete_id,))
+			self._commit()
+
+	def add_item(self, title, value, item_type, category_name):
+		with self._lock:
+			cat_id = self.get_category_id(category_name, create_if_not_exists=True)
+			cursor = self.conn.cursor()
+			cursor.execute(
+				"INSERT INTO items (title, value, type, category_id) VALUES (?, ?, ?, ?)",
+				(title, value, item_type, cat_id)
+			)
+			self._commit()
+
+	def add_items(self, items, category_name):
+		# Alta masiva de (title, value, type) en una transacción. Se omiten los que ya existen por título
+		# o por valor, también los repetidos dentro de la propia lista. Devuelve (añadidos, omitidos).
+		with self._lock:
+			cursor = self.conn.cursor()
+			try:
+				cursor.execute("INSERT OR IGNORE INTO categories (name) VALUES (?)", (category_name,))
+				cursor.execute("SELECT id FROM categories WHERE name = ?", (category_name,))
+				cat_id = cursor.fetchone()[0]
+				existing = set()
+				for start in range(0, len(items), BULK_LOOKUP_CHUNK_SIZE):
+					chunk = items[start:start + BULK_LOOKUP_CHUNK_SIZE]
+					placeholders = ", ".join("?" * len(chunk))
+					cursor.execute(
+						f"SELECT title FROM items WHERE title IN ({placeholders})", [item[0] for item in chunk]
+					)
+					existing.update(row[0] for row in cursor.fetchall())
+					cursor.execute(
+						f"SELECT value FROM items WHERE value IN ({placeholders})", [item[1] for item in chunk]
+					)
+					existing.update(row[0] for row in cursor.fetchall())
+				new_items = []
+				for title, value, item_type in items:
+					if title in existing or value in existing:
+						continue
+					existing.add(title)
+					existing.add(value)
+					new_items.append((title, value, item_type, cat_id))
+				cursor.executemany(
+					"INSERT OR IGNORE INTO items (title, value, type, category_id) VALUES (?, ?, ?, ?)", new_items
+				)
+				added = max(cursor.rowcount, 0)
+				self._commit()
+			except Exception:
+				self.conn.rollback()
+				raise
+			return added, len(items) - added
+
+	def update_item(self, item_id, title, value, item_type, category_name):
+		with self._lock:
+			cat_id = self.get_category_id(category_name, create_if_not_exists=True)
+			cursor = self.conn.cursor()
+			cursor.execute(
+				"UPDATE items SET title=?, value=?, type=?, category_id=?, "
+				"path_ok = CASE WHEN value = ? AND type = ? THEN path_ok END, "
+				"checked_at = CASE WHEN value = ? AND type = ? THEN checked_at END "
+				"WHERE id=?",
+				(title, value, item_type, cat_id, value, item_type, value, item_type, item_id)
+			)
+			self._commit()
+
+	def delete_item(self, item_id):
+		with self._lock:
+			with self._pending_lock:
+				self._pending_usage.pop(item_id, None)
+			cursor = self.conn.cursor()
+			cursor.execute("DELETE FROM items WHERE id=?", (item_id,))
+			self._commit()
+
+	def get_item(self, item_id):
+		cursor = self.conn.cursor()
+		cursor.execute(
+			"SELECT i.title, i.value, i.type, c.name "
+			"FROM items i LEFT JOIN categories c ON i.category_id = c.id "
+			"WHERE i.id = ?",
+			(item_id,)
+		)
+		return cursor.fetchone()
 
 	def get_item_by_title(self, title):
 		cursor = self.conn.cursor()
@@ -145,22 +845,59 @@ class DatabaseManager:
 		)
 		return cursor.fetchone()
 
-	def get_items(self, filter_by='all', sort_by='alpha_asc', category_filter=None, search_term=None):
-		query = "SELECT i.title, c.name FROM items i LEFT JOIN categories c ON i.category_id = c.id"
+	def get_items(
+			self, filter_by='all', sort_by='alpha_asc', category_filter=None, search_term=None, search_mode='fts',
+			limit=50
+	):
+		# limit solo se aplica a la búsqueda aproximada, que devuelve los mejores resultados por puntuación.
+		search_kind = self.get_search_kind(search_term, search_mode)
+		if search_kind == 'fuzzy':
+			return self._get_fuzzy_items(filter_by, category_filter, search_term, limit)
+
+		if filter_by == 'broken' and sort_by in ('category_asc', 'category_desc'):
+			# Recorre categories en orden y, para cada una, idx_items_broken_category; si no, SQLite parte de
+			# idx_items_broken_paths y ordena aparte.
+			query = (
+				"SELECT i.id, i.title, c.name, i.value FROM categories c CROSS JOIN items i ON i.category_id = c.id"
+			)
+		else:
+			query = "SELECT i.id, i.title, c.name, i.value FROM items i JOIN categories c ON i.category_id = c.id"
 		where_clauses = []
 		params = []
 
-		if filter_by != 'all':
-			where_clauses.append("i.type = ?")
+		if filter_by == 'broken':
+			where_clauses.append("i.path_ok = 0")
+		elif filter_by != 'all':
+			if sort_by in ('category_asc', 'category_desc'):
+				# El "+" impide usar idx_items_type_* y deja que el orden salga de idx_items_category_title.
+				where_clauses.append("+i.type = ?")
+			else:
+				where_clauses.append("i.type = ?")
 			params.append(filter_by)
 
 		if category_filter:
 			where_clauses.append("c.name = ?")
 			params.append(category_filter)
 
-		if search_term:
-			where_clauses.append("i.title LIKE ?")
-			params.append(f"%{search_term}%")
+		if search_kind == 'fts':
+			where_clauses.append("i.id IN (SELECT rowid FROM items_fts WHERE items_fts MATCH ?)")
+			params.append(self._fts_match_query(search_term))
+		elif search_kind == 'substring':
+			# Prefijos sin diacríticos ("cancion" encuentra "Canción") más subcadenas ("hub" encuentra "GitHub"),
+			# las dos desde su índice.
+			where_clauses.append(
+				"i.id IN (SELECT rowid FROM items_fts WHERE items_fts MATCH ? "
+				"UNION SELECT rowid FROM items_trigram_fts WHERE items_trigram_fts MATCH ?)"
+			)
+			params.extend([self._fts_match_query(search_term), self._trigram_match_query(search_term)])
+		elif search_kind:
+			pattern = "%{0}%".format(
+				search_term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+			)
+			where_clauses.append(
+				"(i.title LIKE ? ESCAPE '\\' OR i.value LIKE ? ESCAPE '\\' OR c.name LIKE ? ESCAPE '\\')"
+			)
+			params.extend([pattern, pattern, pattern])
 
 		if where_clauses:
 			query += " WHERE " + " AND ".join(where_clauses)
@@ -171,138 +908,322 @@ class DatabaseManager:
 			'date_desc': " ORDER BY i.created_at DESC",
 			'date_asc': " ORDER BY i.created_at ASC",
 			'usage_desc': " ORDER BY i.usage_count DESC, i.title COLLATE NOCASE ASC",
-			'category_asc': " ORDER BY c.name COLLATE NOCASE ASC, i.title COLLATE NOCASE ASC",
-			'category_desc': " ORDER BY c.name COLLATE NOCASE DESC, i.title COLLATE NOCASE ASC",
+			'frecency_desc': " ORDER BY i.frecency DESC, i.title COLLATE NOCASE ASC",
+			'category_asc': " ORDER BY c.name COLLATE NOCASE ASC, c.id ASC, i.title COLLATE NOCASE ASC",
+			'category_desc': " ORDER BY c.name COLLATE NOCASE DESC, c.id DESC, i.title COLLATE NOCASE ASC",
 		}
 		query += sort_map.get(sort_by, " ORDER BY i.title COLLATE NOCASE ASC")
 
+		if sort_by in ('usage_desc', 'frecency_desc') and self._pending_usage:
+			self.flush_pending_writes()
 		cursor = self.conn.cursor()
 		cursor.execute(query, tuple(params))
 		return cursor.fetchall()
 
-	def increment_usage_count(self, title):
+	def _get_fuzzy_items(self, filter_by, category_filter, search_term, limit):
+		# SQLite preselecciona por trigramas comunes; Python solo puntúa esos candidatos.
+		# Cada trigrama del término es una consulta a la columna fuzzy, que devuelve cada elemento una vez.
+		padded_term = _pad_for_trigrams(search_term[:FUZZY_MAX_TERM_LENGTH])
+		term_trigrams = sorted({padded_term[i:i + 3] for i in range(len(padded_term) - 2)})
+		params = [self._trigram_match_query(trigram, "fuzzy") for trigram in term_trigrams]
+		where_clauses = []
+		if filter_by == 'broken':
+			where_clauses.append("i.path_ok = 0")
+		elif filter_by != 'all':
+			where_clauses.append("i.type = ?")
+			params.append(filter_by)
+		if category_filter:
+			where_clauses.append("c.name = ?")
+			params.append(category_filter)
+		query = (
+			"WITH t(id) AS ("
+			+ " UNION ALL ".join(
+				["SELECT rowid FROM items_trigram_fts WHERE items_trigram_fts MATCH ?"] * len(term_trigrams)
+			)
+			+ "), h(id, hits) AS (SELECT id, COUNT(*) FROM t GROUP BY id HAVING COUNT(*) >= ?) "
+			"SELECT i.id, i.title, c.name, i.value, i.usage_count, h.hits "
+			"FROM h JOIN items i ON i.id = h.id JOIN categories c ON i.category_id = c.id"
+		)
+		params.insert(len(term_trigrams), max(1, math.ceil(FUZZY_MIN_SIMILARITY * len(term_trigrams))))
+		if where_clauses:
+			query += " WHERE " + " AND ".join(where_clauses)
+		query += " ORDER BY h.hits DESC LIMIT ?"
+		params.append(FUZZY_CANDIDATES)
+
+		if self._pending_usage:
+			self.flush_pending_writes()
 		cursor = self.conn.cursor()
-		cursor.execute("UPDATE items SET usage_count = usage_count + 1 WHERE title = ?", (title,))
-		self.conn.commit()
+		cursor.execute(query, tuple(params))
+		term = search_term.translate(_ASCII_LOWER)
+		scored = []
+		for item_id, title, cat_name, value, usage_count, hits in cursor.fetchall():
+			score = _fuzzy_score(term, title.translate(_ASCII_LOWER), hits / len(term_trigrams), usage_count)
+			scored.append((-score, title.lower(), (item_id, title, cat_name, value)))
+		scored.sort()
+		return [row for _score, _title, row in scored[:limit]]
+
+	def get_paths_to_check(self, checked_before, limit, offset=0):
+		cursor = self.conn.cursor()
+		cursor.execute(
+			"SELECT id, value FROM items WHERE type = 'path' AND (checked_at IS NULL OR checked_at < ?) "
+			"ORDER BY checked_at, id LIMIT ? OFFSET ?",
+			(checked_before, limit, offset)
+		)
+		return cursor.fetchall()
+
+	def set_path_health(self, results, checked_at):
+		# results: [(item_id, existe)], con None si no se pudo saber a tiempo; esas no se marcan como
+		# comprobadas, para reintentarlas. Solo cuenta como cambio, e invalida las cachés, si alguna ruta
+		# pasa de rota a válida o al revés.
+		with self._lock:
+			cursor = self.conn.cursor()
+			cursor.executemany(
+				"UPDATE items SET checked_at = ? WHERE id = ?",
+				[(checked_at, item_id) for item_id, ok in results if ok is not None]
+			)
+			cursor.executemany(
+				"UPDATE items SET path_ok = ? WHERE id = ? AND path_ok IS NOT ?",
+				[(int(ok), item_id, int(ok)) for item_id, ok in results if ok is not None]
+			)
+			if cursor.rowcount > 0:
+				self._commit()
+			else:
+				self.conn.commit()
+
+	def increment_usage_count(self, item_id):
+		with self._pending_lock:
+			self._pending_usage.setdefault(item_id, []).append(time.time())
+			self._schedule_flush()
 
 	def get_all_items_for_nav(self):
 		cursor = self.conn.cursor()
 		cursor.execute(
 			"SELECT i.title, i.value, i.type, c.name "
 			"FROM items i LEFT JOIN categories c ON i.category_id = c.id "
-			"ORDER BY i.title COLLATE NOCASE ASC"
+			"ORDER BY i.frecency DESC, i.title COLLATE NOCASE ASC"
 		)
 		return cursor.fetchall()
 
+	def _get_settings(self):
+		settings = self._settings
+		if settings is None:
+			with self._lock:
+				cursor = self.conn.cursor()
+				cursor.execute("SELECT key, value FROM settings")
+				settings = dict(cursor.fetchall())
+				with self._pending_lock:
+					settings.update(self._pending_settings)
+					self._settings = settings
+		return settings
+
+	def _invalidate_settings(self):
+		self._settings = None
+
 	def get_setting(self, key, default=None):
-		cursor = self.conn.cursor()
-		cursor.execute("SELECT value FROM settings WHERE key=?", (key,))
-		row = cursor.fetchone()
-		return row[0] if row else default
+		return self._get_settings().get(key, default)
 
 	def set_setting(self, key, value):
-		cursor = self.conn.cursor()
-		cursor.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
-		self.conn.commit()
-
-	def read_data_from_backup(self, backup_path):
-		backup_conn = sqlite3.connect(backup_path)
-		backup_cursor = backup_conn.cursor()
+		with self._lock:
+			with self._pending_lock:
+				self._pending_settings.pop(key, None)
+			cursor = self.conn.cursor()
+			cursor.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
+			self.conn.commit()
+			self._get_settings()[key] = value
 
-		backup_cursor.execute("SELECT name FROM categories")
-		categories = [row[0] for row in backup_cursor.fetchall()]
+	def defer_setting(self, key, value):
+		# Para ajustes que cambian muy a menudo: solo se guarda el último valor en el siguiente volcado.
+		# No toma _lock: si la copia de settings no está cargada, la carga ya incluirá el valor pendiente.
+		with self._pending_lock:
+			if self._settings is not None:
+				self._settings[key] = value
+			self._pending_settings[key] = value
+			self._schedule_flush()
 
-		backup_cursor.execute(
-			"SELECT title, value, type, c.name "
-			"FROM items i LEFT JOIN categories c ON i.category_id = c.id"
-		)
-		items = []
-		for row in backup_cursor.fetchall():
-			items.append({
-				"title": row[0], "value": row[1], "type": row[2],
-				"category": row[3] or UNCATEGORIZED
-			})
+	def _schedule_flush(self):
+		# Con _pending_lock tomado.
+		if self._flush_timer is None:
+			self._flush_timer = threading.Timer(WRITE_BEHIND_DELAY, self.flush_pending_writes)
+			self._flush_timer.daemon = True
+			self._flush_timer.start()
 
-		backup_cursor.execute("SELECT key, value FROM settings")
-		settings = backup_cursor.fetchall()
+	def flush_pending_writes(self):
+		with self._lock:
+			with self._pending_lock:
+				if self._flush_timer is not None:
+					self._flush_timer.cancel()
+					self._flush_timer = None
+				if not self.conn or not (self._pending_settings or self._pending_usage):
+					return
+				settings = list(self._pending_settings.items())
+				pending_usage = self._pending_usage
+				self._pending_settings = {}
+				self._pending_usage = {}
+			usage = [(len(times), item_id) for item_id, times in pending_usage.items()]
+			events = [(used_at, item_id) for item_id, times in pending_usage.items() for used_at in times]
+			cursor = self.conn.cursor()
+			cursor.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", settings)
+			cursor.executemany("UPDATE items SET usage_count = usage_count + ? WHERE id = ?", usage)
+			cursor.executemany(
+				"INSERT INTO usage_events (item_id, used_at) SELECT id, ? FROM items WHERE id = ?", events
+			)
+			cursor.executemany("UPDATE items SET frecency = frecency_add(frecency, ?) WHERE id = ?", events)
+			if usage:
+				# frecency ya acumula su peso; la tabla no crece sin límite.
+				cursor.execute("DELETE FROM usage_events WHERE used_at < ?", (time.time() - USAGE_EVENTS_MAX_AGE,))
+				self._commit()
+			else:
+				self.conn.commit()
 
-		backup_conn.close()
-		return {"categories": categories, "items": items, "settings": settings}
+	def restore_from_backup(self, backup_path):
+		# Fusiona la copia adjuntándola con ATTACH: todo el trabajo son INSERT ... SELECT dentro de SQLite,
+		# así que la memoria no crece con el tamaño de la copia.
+		with self._lock:
+			self.flush_pending_writes()
+			self.conn.execute("ATTACH DATABASE ? AS backup", (backup_path,))
+			try:
+				counts = self._run_in_transaction(self._merge_attached_backup)
+			finally:
+				self.conn.execute("DETACH DATABASE backup")
+				self._invalidate_settings()
+			self.change_counter += 1
+			return counts
 
-	def merge_data_from_backup(self, data):
+	def _merge_attached_backup(self):
 		cursor = self.conn.cursor()
-
-		for cat_name in data.get("categories", []):
-			self.add_category(cat_name)
-
-		items_to_insert = []
-		for item in data.get("items", []):
-			cat_id = self.get_category_id(item["category"], create_if_not_exists=True)
-			items_to_insert.append((item["title"], item["value"], item["type"], cat_id))
-
-		if items_to_insert:
-			cursor.executemany(
-				"INSERT OR IGNORE INTO items (title, value, type, category_id) VALUES (?, ?, ?, ?)",
-				items_to_insert
+		cursor.execute("INSERT OR IGNORE INTO main.categories (name) SELECT name FROM backup.categories")
+		categories_added = cursor.rowcount
+		# Los elementos sin categoría válida en la copia van a la categoría por defecto.
+		cursor.execute(
+			"INSERT OR IGNORE INTO main.categories (name) SELECT ? WHERE EXISTS ("
+			"SELECT 1 FROM backup.items b LEFT JOIN backup.categories bc ON bc.id = b.category_id "
+			"WHERE bc.id IS NULL)",
+			(UNCATEGORIZED,)
+		)
+		categories_added += cursor.rowcount
+		# Por tramos de rowid: con temp_store en memoria el diario de cada sentencia vive en RAM
+		# y crecería con el tamaño de la copia.
+		cursor.execute("SELECT MIN(rowid), MAX(rowid) FROM backup.items")
+		first_rowid, last_rowid = cursor.fetchone()
+		items_added = 0
+		if first_rowid is not None:
+			items_added = self._insert_items_in_bulk(self._merge_attached_items, first_rowid, last_rowid)
+		settings_restored = 0
+		cursor.execute("SELECT 1 FROM backup.sqlite_master WHERE type = 'table' AND name = 'settings'")
+		if cursor.fetchone() is not None:
+			cursor.execute(
+				"INSERT OR REPLACE INTO main.settings (key, value) SELECT key, value FROM backup.settings "
+				f"WHERE key NOT IN ({', '.join('?' * len(TRANSIENT_SETTINGS))})",
+				TRANSIENT_SETTINGS
 			)
+			settings_restored = cursor.rowcount
+		return {"categories": categories_added, "items": items_added, "settings": settings_restored}
 
-		settings_to_insert = data.get("settings", [])
-		if settings_to_insert:
-			cursor.executemany(
-				"INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
-				settings_to_insert
+	def _merge_attached_items(self, first_rowid, last_rowid):
+		cursor = self.conn.cursor()
+		items_added = 0
+		for start in range(first_rowid, last_rowid + 1, MERGE_CHUNK_SIZE):
+			cursor.execute(
+				"INSERT OR IGNORE INTO main.items (title, value, type, category_id) "
+				"SELECT b.title, b.value, b.type, c.id "
+				"FROM backup.items b "
+				"LEFT JOIN backup.categories bc ON bc.id = b.category_id "
+				"JOIN main.categories c ON c.name = COALESCE(bc.name, ?) "
+				"WHERE b.rowid BETWEEN ? AND ?",
+				(UNCATEGORIZED, start, start + MERGE_CHUNK_SIZE - 1)
 			)
+			items_added += cursor.rowcount
+		return items_added
 
-		self.conn.commit()
+	def has_pending_json_migration(self):
+		return self.get_setting(JSON_MIGRATION_KEY) is not None
 
-	def migrate_from_json(self, json_path):
+	def migrate_from_json(self, json_path, progress=None):
+		# Lee links.json por partes e inserta por lotes, cada uno en su transacción. El lote guarda también
+		# hasta qué byte se ha procesado, así que una migración interrumpida sigue donde lo dejó.
 		if not os.path.exists(json_path):
 			return 0
-
-		try:
-			with open(json_path, 'r', encoding='utf-8') as f:
-				data = json.load(f)
-		except (json.JSONDecodeError, IOError):
-			return 0
-
-		user_cats = data.get("__user_defined_categories__", [])
-		if isinstance(user_cats, list):
-			for cat_name in user_cats:
-				self.add_category(cat_name)
+		stat = os.stat(json_path)
+		file_id = [os.path.abspath(json_path), stat.st_size, int(stat.st_mtime)]
+		offset = 0
+		marker = self.get_setting(JSON_MIGRATION_KEY)
+		if marker:
+			try:
+				saved = json.loads(marker)
+				if saved[:3] == file_id:
+					offset = saved[3]
+			except (ValueError, TypeError, IndexError):
+				pass
 
 		rows_added = 0
-		for title, item_data in data.items():
-			if title == "__user_defined_categories__":
-				continue
-
-			value = ""
-			item_type = "url"
-			category = UNCATEGORIZED
-
-			if isinstance(item_data, str):
-				value = item_data
-			elif isinstance(item_data, dict):
-				value = item_data.get("url", item_data.get("path", ""))
-				if "path" in item_data and "url" not in item_data:
-					item_type = "path"
-				cats = item_data.get("categories", [])
-				if isinstance(cats, list) and cats:
-					category = cats[0]
-				elif isinstance(cats, str) and cats:
-					category = cats
-			else:
-				continue
-
-			if not value:
-				continue
+		batch = []
+		try:
+			with open(json_path, 'rb') as f:
+				reader = _JsonObjectReader(f, offset)
+				for title, item_data in reader:
+					if title == "__user_defined_categories__":
+						if isinstance(item_data, list):
+							batch.extend((None, None, None, cat_name) for cat_name in item_data)
+						continue
+					row = _legacy_json_item(title, item_data)
+					if row is not None:
+						batch.append(row)
+					if len(batch) >= JSON_MIGRATION_BATCH_SIZE:
+						added = self._insert_json_batch(batch, file_id + [reader.tell()])
+						if added is None:
+							return rows_added
+						rows_added += added
+						batch = []
+						if progress is not None:
+							progress(reader.tell(), stat.st_size)
+		except (ValueError, IOError):
+			# Como antes, un archivo dañado no es un error: se guarda lo leído hasta ese punto.
+			pass
+		added = self._insert_json_batch(batch, None)
+		if added is not None:
+			rows_added += added
+		if progress is not None:
+			progress(stat.st_size, stat.st_size)
+		return rows_added
 
+	def _insert_json_batch(self, batch, marker):
+		# marker None indica el último lote: se borra la marca de migración pendiente.
+		with self._lock:
+			if not self.conn:
+				return None
+			cursor = self.conn.cursor()
 			try:
-				self.add_item(title, value, item_type, category)
-				rows_added += 1
-			except sqlite3.IntegrityError:
-				continue
-
-		return rows_added
+				category_names = {row[3] for row in batch}
+				cursor.executemany(
+					"INSERT OR IGNORE INTO categories (name) VALUES (?)", [(name,) for name in category_names]
+				)
+				category_ids = {}
+				for name in category_names:
+					cursor.execute("SELECT id FROM categories WHERE name = ?", (name,))
+					category_ids[name] = cursor.fetchone()[0]
+				rows = [
+					(title, value, item_type, category_ids[category])
+					for title, value, item_type, category in batch if title is not None
+				]
+				self._insert_items_in_bulk(
+					cursor.executemany,
+					"INSERT OR IGNORE INTO items (title, value, type, category_id) VALUES (?, ?, ?, ?)", rows
+				)
+				rows_added = max(cursor.rowcount, 0)
+				if marker is None:
+					cursor.execute("DELETE FROM settings WHERE key = ?", (JSON_MIGRATION_KEY,))
+				else:
+					cursor.execute(
+						"INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+						(JSON_MIGRATION_KEY, json.dumps(marker))
+					)
+				self._commit()
+			except Exception:
+				self.conn.rollback()
+				raise
+			finally:
+				self._invalidate_settings()
+			return rows_added
 
 	def get_item_count(self):
 		cursor = self.conn.cursor()
@@ -310,19 +1231,58 @@ class DatabaseManager:
 		return cursor.fetchone()[0]
 
 	def clear_all_data(self):
-		cursor = self.conn.cursor()
-		cursor.execute("DELETE FROM items")
-		cursor.execute("DELETE FROM categories")
-		cursor.execute("DELETE FROM settings")
-		self.conn.commit()
-		self.add_category(UNCATEGORIZED)
+		with self._lock:
+			with self._pending_lock:
+				self._pending_settings.clear()
+				self._pending_usage.clear()
+			cursor = self.conn.cursor()
+			cursor.execute("DELETE FROM items")
+			cursor.execute("DELETE FROM categories")
+			cursor.execute("DELETE FROM settings")
+			self._commit()
+			self._invalidate_settings()
+			self.add_category(UNCATEGORIZED)
 
 	def close(self):
-		if self.conn:
-			self.conn.close()
-			self.conn = None
+		with self._lock:
+			self.flush_pending_writes()
+			if self.conn:
+				self.conn.close()
+				self.conn = None
 
 	def reconnect(self):
-		if not self.conn:
-			self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-			self.conn.execute("PRAGMA foreign_keys = ON")
+		with self._lock:
+			if not self.conn:
+				self.conn = connect(self.db_path, self.profile)
+
+	def backup_to(self, backup_path, progress=None):
+		# Copia en caliente con la API de backup desde una conexión propia: en WAL no bloquea a la principal
+		# y la copia sale de una instantánea coherente, incluido lo que aún está en el -wal.
+		self.flush_pending_writes()
+		on_progress = None
+		if progress is not None:
+			def on_progress(status, remaining, total):
+				progress(total - remaining, total)
+		temp_path = backup_path + ".tmp"
+		if os.path.exists(temp_path):
+			os.remove(temp_path)
+		source = connect(self.db_path, self.profile)
+		try:
+			# Una transacción de lectura abierta fija la instantánea entre pasos; sin ella, cada escritura
+			# de la conexión principal haría reiniciar la copia desde el principio.
+			source.execute("BEGIN")
+			source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+			target = sqlite3.connect(temp_path)
+			try:
+				source.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=on_progress)
+				# La copia hereda el modo WAL; se deja como un único archivo autónomo.
+				target.execute("PRAGMA journal_mode = DELETE")
+			finally:
+				target.close()
+		except Exception:
+			if os.path.exists(temp_path):
+				os.remove(temp_path)
+			raise
+		finally:
+			source.close()
+		os.replace(temp_path, backup_path)
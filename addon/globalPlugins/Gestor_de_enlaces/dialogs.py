@@ -6,15 +6,18 @@
 
 import os
 import re
-import shutil
 import threading
 import webbrowser
+from functools import partial
 import wx
 import gui
 import ui
 import speech
 from time import sleep
 import addonHandler
+from .search_cache import SearchCache
+from .path_checker import path_service
+from .hooks import hook_methods, call_after, show_modal, message_box
 
 addonHandler.initTranslation()
 
@@ -24,18 +27,24 @@ UNCATEGORIZED = _("Sin categoría")
 ALL_CATEGORIES = _("Todas las categorías")
 
 
+URL_PATTERN = re.compile(
+	r'^(https?://|ftp://|file://|www\.)'
+	r'|'
+	r'^(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,6}$',
+	re.IGNORECASE
+)
+# Unidad (C:\) o recurso compartido (\\servidor\recurso).
+ABSOLUTE_PATH_PATTERN = re.compile(r'^(?:[a-zA-Z]:[\\/]|\\\\[^\\/]+[\\/])')
+
+
 def validateInput(value):
 	if not value:
 		return False, 'invalid'
-	url_pattern = re.compile(
-		r'^(https?://|ftp://|file://|www\.)'
-		r'|'
-		r'^(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,6}$',
-		re.IGNORECASE
-	)
-	if url_pattern.search(value):
+	if URL_PATTERN.search(value):
 		return True, 'url'
-	if os.path.exists(value):
+	exists = path_service.exists(value)
+	# Si la comprobación no termina a tiempo (red lenta, unidad desconectada) se acepta una ruta absoluta.
+	if exists or (exists is None and ABSOLUTE_PATH_PATTERN.match(value)):
 		return True, 'path'
 	return False, 'invalid'
 
@@ -55,6 +64,24 @@ def _killSpeak(time):
 	speech.setSpeechMode(speech.SpeechMode.talk)
 
 
+def progress_reporter(message):
+	"""Devuelve un callback progress(done, total) que anuncia message cada 25 %.
+
+	Lo llama el hilo de la base de datos; cada tarea tiene el suyo, así que dos tareas a la vez no se pisan.
+	"""
+	last_percent = 0
+
+	def report(done, total):
+		nonlocal last_percent
+		percent = done * 100 // total if total else 100
+		if percent < 100 and percent // 25 > last_percent // 25:
+			call_after(ui.message, message.format(percent))
+		last_percent = percent
+
+	return report
+
+
+@hook_methods("event", prefixes=("on_",))
 class CategoryManagerDialog(wx.Dialog):
 	def __init__(self, parent, title, db_manager):
 		super(CategoryManagerDialog, self).__init__(parent, title=title, size=(450, 350))
@@ -100,7 +127,7 @@ class CategoryManagerDialog(wx.Dialog):
 	def on_add(self, event):
 		# Translators: Título del diálogo para nueva categoría.
 		with wx.TextEntryDialog(self, _("Nombre de la nueva categoría:"), _("Añadir Categoría")) as dlg:
-			if dlg.ShowModal() == wx.ID_OK:
+			if show_modal(dlg) == wx.ID_OK:
 				new_name = dlg.GetValue().strip()
 				if new_name and new_name != UNCATEGORIZED:
 					self.db_manager.add_category(new_name)
@@ -114,7 +141,7 @@ class CategoryManagerDialog(wx.Dialog):
 			return
 		# Translators: Título del diálogo para renombrar categoría.
 		with wx.TextEntryDialog(self, _("Renombrar categoría '{0}' a:").format(selected), _("Renombrar Categoría"), value=selected) as dlg:
-			if dlg.ShowModal() == wx.ID_OK:
+			if show_modal(dlg) == wx.ID_OK:
 				new_name = dlg.GetValue().strip()
 				if new_name and new_name != selected and new_name != UNCATEGORIZED:
 					self.db_manager.rename_category(selected, new_name)
@@ -127,7 +154,7 @@ class CategoryManagerDialog(wx.Dialog):
 		if not selected:
 			return
 		# Translators: Confirmación de borrado de categoría.
-		if wx.MessageBox(
+		if message_box(
 			_("¿Borrar la categoría '{0}'? Los elementos pasarán a '{1}'.").format(selected, UNCATEGORIZED),
 			_("Confirmar"), wx.YES_NO | wx.ICON_QUESTION
 		) == wx.YES:
@@ -137,12 +164,15 @@ class CategoryManagerDialog(wx.Dialog):
 			mute(0.3, _("Categoría '{0}' borrada.").format(selected))
 
 
+@hook_methods("event", prefixes=("on_",))
 class AddEditDialog(wx.Dialog):
-	def __init__(self, parent, title, db_manager, item_title=None):
+	def __init__(self, parent, title, db_manager, item_id=None):
 		super(AddEditDialog, self).__init__(parent, title=title)
 		self.db_manager = db_manager
-		self.item_title = item_title
-		self.item_data = self.db_manager.get_item_by_title(item_title) if item_title else None
+		self.item_id = item_id
+		self.item_data = self.db_manager.get_item(item_id) if item_id is not None else None
+		# (title, value, item_type, category) validados por on_save.
+		self._saved_item = None
 		self.create_widgets()
 		self.bind_events()
 		self.populate_fields()
@@ -201,7 +231,7 @@ class AddEditDialog(wx.Dialog):
 
 	def on_manage_categories(self, event):
 		with CategoryManagerDialog(self, _("Gestionar Categorías"), self.db_manager) as dlg:
-			dlg.ShowModal()
+			show_modal(dlg)
 		self.populate_fields()
 
 	def on_save(self, event):
@@ -212,34 +242,34 @@ class AddEditDialog(wx.Dialog):
 			category = UNCATEGORIZED
 		if not title or not value:
 			# Translators: Error cuando el título o valor están vacíos.
-			wx.MessageBox(_("El título y el valor no pueden estar vacíos."), _('Error'), wx.OK | wx.ICON_ERROR, self)
+			message_box(_("El título y el valor no pueden estar vacíos."), _('Error'), wx.OK | wx.ICON_ERROR, self)
 			return
 		is_valid, item_type = validateInput(value)
 		if not is_valid:
 			# Translators: Error cuando el valor no es URL ni ruta válida.
-			wx.MessageBox(_("El valor no es una URL o ruta válida."), _('Error'), wx.OK | wx.ICON_ERROR, self)
+			message_box(_("El valor no es una URL o ruta válida."), _('Error'), wx.OK | wx.ICON_ERROR, self)
 			return
-		if not self.item_title and self.db_manager.get_item_by_title(title):
+		if self.item_id is None and self.db_manager.get_item_by_title(title):
 			# Translators: Error cuando ya existe un elemento con ese título.
-			wx.MessageBox(_("Un elemento con este título ya existe."), _('Error'), wx.OK | wx.ICON_ERROR, self)
+			message_box(_("Un elemento con este título ya existe."), _('Error'), wx.OK | wx.ICON_ERROR, self)
 			return
+		# validateInput puede esperar a una unidad de red lenta: su resultado se guarda para no repetirlo.
+		self._saved_item = (title, value, item_type, category)
 		event.Skip()
 
 	def get_item_data(self):
-		title = self.txtTitle.GetValue().strip()
-		value = self.txtValue.GetValue().strip().strip('"')
-		category = self.itemCategoryCombo.GetValue().strip()
-		if not category:
-			category = UNCATEGORIZED
-		_is_valid, item_type = validateInput(value)
-		return title, value, item_type, category
+		return self._saved_item
 
 
+@hook_methods("event", prefixes=("on_",))
 class SettingsDialog(wx.Dialog):
-	def __init__(self, parent, title, db_manager, db_path):
+	def __init__(self, parent, title, db_manager, db_path, db_worker):
 		super(SettingsDialog, self).__init__(parent, title=title)
 		self.db_manager = db_manager
 		self.db_path = db_path
+		self.db_worker = db_worker
+		# Las tareas largas pueden terminar con este diálogo ya cerrado; la lista del gestor sigue viva.
+		self.link_manager = parent
 		self.create_widgets()
 		self.bind_events()
 		self.populate_fields()
@@ -310,7 +340,7 @@ class SettingsDialog(wx.Dialog):
 
 	def on_manage_categories(self, event):
 		with CategoryManagerDialog(self, _("Gestionar Categorías"), self.db_manager) as dlg:
-			dlg.ShowModal()
+			show_modal(dlg)
 		self.GetParent().display_items()
 
 	def on_export(self, event):
@@ -321,64 +351,75 @@ class SettingsDialog(wx.Dialog):
 			defaultFile="gestor_enlaces_backup.db",
 			style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT
 		) as dlg:
-			if dlg.ShowModal() == wx.ID_OK:
-				try:
-					shutil.copy2(self.db_path, dlg.GetPath())
-					# Translators: Mensaje de éxito al guardar copia de seguridad.
-					mute(0.3, _("Copia de seguridad guardada."))
-				except Exception as e:
-					# Translators: Mensaje de error al exportar.
-					wx.MessageBox(
-						_("Error: {0}").format(str(e)), _("Error"), wx.OK | wx.ICON_ERROR
-					)
+			if show_modal(dlg) == wx.ID_OK:
+				self.btn_export.Disable()
+				# Translators: Progreso al guardar la copia de seguridad.
+				progress = progress_reporter(_("Copia de seguridad: {0}%"))
+				self.db_worker.submit(
+					partial(self.db_manager.backup_to, dlg.GetPath(), progress=progress),
+					on_success=lambda result: self._on_export_success(),
+					on_error=lambda e: self._on_export_error(str(e))
+				)
+
+	def _refresh_link_manager(self):
+		if self.link_manager:
+			self.link_manager.display_items()
+
+	def _on_export_success(self):
+		# El diálogo puede haberse cerrado mientras la tarea seguía en marcha.
+		if self:
+			self.btn_export.Enable()
+		# Translators: Mensaje de éxito al guardar copia de seguridad.
+		mute(0.3, _("Copia de seguridad guardada."))
+
+	def _on_export_error(self, error_msg):
+		if self:
+			self.btn_export.Enable()
+		# Translators: Mensaje de error al exportar.
+		message_box(
+			_("Error: {0}").format(error_msg), _("Error"), wx.OK | wx.ICON_ERROR
+		)
 
 	def on_import(self, event):
 		# Translators: Confirmación antes de restaurar copia de seguridad.
 		msg = _("Esto fusionará los datos de la copia de seguridad con tu base de datos actual. ¿Continuar?")
-		if wx.MessageBox(msg, _("Aviso de Restauración"), wx.YES_NO | wx.ICON_QUESTION) != wx.YES:
+		if message_box(msg, _("Aviso de Restauración"), wx.YES_NO | wx.ICON_QUESTION) != wx.YES:
 			return
 		with wx.FileDialog(
 			self, _("Importar copia de seguridad"),
 			wildcard=_("Archivo de Base de Datos (*.db)|*.db"),
 			style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST
 		) as dlg:
-			if dlg.ShowModal() == wx.ID_OK:
+			if show_modal(dlg) == wx.ID_OK:
 				source_path = dlg.GetPath()
 				self.btn_import.Disable()
-				thread = threading.Thread(target=self._perform_import, args=(source_path,))
-				thread.start()
-
-	def _perform_import(self, source_path):
-		try:
-			data = self.db_manager.read_data_from_backup(source_path)
-			wx.CallAfter(self._finish_import, data)
-		except Exception as e:
-			wx.CallAfter(self._on_import_error, str(e))
-
-	def _finish_import(self, data):
-		try:
-			self.db_manager.merge_data_from_backup(data)
-			self._on_import_success()
-		except Exception as e:
-			self._on_import_error(str(e))
+				self.db_worker.submit(
+					partial(self.db_manager.restore_from_backup, source_path),
+					on_success=self._on_import_success,
+					on_error=lambda e: self._on_import_error(str(e))
+				)
 
-	def _on_import_success(self):
-		self.btn_import.Enable()
+	def _on_import_success(self, counts):
+		if self:
+			self.btn_import.Enable()
 		# Translators: Mensaje de éxito al importar copia de seguridad.
-		mute(0.3, _("Importación completada con éxito."))
-		self.GetParent().display_items()
+		mute(0.3, _("Importación completada: {0} elementos y {1} categorías nuevos.").format(
+			counts["items"], counts["categories"]
+		))
+		self._refresh_link_manager()
 
 	def _on_import_error(self, error_msg):
-		self.btn_import.Enable()
+		if self:
+			self.btn_import.Enable()
 		# Translators: Mensaje de error al importar copia de seguridad.
-		wx.MessageBox(
+		message_box(
 			_("Error durante la importación: {0}").format(error_msg), _("Error"), wx.OK | wx.ICON_ERROR
 		)
 
 	def on_migrate(self, event):
 		# Translators: Confirmación antes de migrar desde JSON.
 		msg = _("Esto fusionará los datos del archivo JSON con la base de datos. ¿Continuar?")
-		if wx.MessageBox(msg, _("Aviso de Migración"), wx.YES_NO | wx.ICON_QUESTION) != wx.YES:
+		if message_box(msg, _("Aviso de Migración"), wx.YES_NO | wx.ICON_QUESTION) != wx.YES:
 			return
 		# Translators: Título del diálogo para seleccionar JSON.
 		with wx.FileDialog(
@@ -386,22 +427,35 @@ class SettingsDialog(wx.Dialog):
 			wildcard=_("Archivos JSON (*.json)|*.json"),
 			style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST
 		) as dlg:
-			if dlg.ShowModal() == wx.ID_OK:
-				try:
-					rows_added = self.db_manager.migrate_from_json(dlg.GetPath())
-					# Translators: Mensaje de éxito de migración.
-					mute(0.3, _("{0} nuevos elementos migrados.").format(rows_added))
-					self.GetParent().display_items()
-				except Exception as e:
-					wx.MessageBox(
-						_("Error al migrar datos: {0}").format(str(e)),
-						_("Error"), wx.OK | wx.ICON_ERROR
-					)
+			if show_modal(dlg) == wx.ID_OK:
+				self.btn_migrate.Disable()
+				# Translators: Progreso de la migración desde JSON.
+				progress = progress_reporter(_("Migración: {0}%"))
+				self.db_worker.submit(
+					partial(self.db_manager.migrate_from_json, dlg.GetPath(), progress=progress),
+					on_success=self._on_migrate_success,
+					on_error=lambda e: self._on_migrate_error(str(e))
+				)
+
+	def _on_migrate_success(self, rows_added):
+		if self:
+			self.btn_migrate.Enable()
+		# Translators: Mensaje de éxito de migración.
+		mute(0.3, _("{0} nuevos elementos migrados.").format(rows_added))
+		self._refresh_link_manager()
+
+	def _on_migrate_error(self, error_msg):
+		if self:
+			self.btn_migrate.Enable()
+		message_box(
+			_("Error al migrar datos: {0}").format(error_msg),
+			_("Error"), wx.OK | wx.ICON_ERROR
+		)
 
 	def on_delete_db(self, event):
 		# Translators: Advertencia antes de borrar la base de datos.
 		msg = _("¡ADVERTENCIA! Esto borrará todos los elementos, categorías y configuraciones. ¿Estás seguro?")
-		if wx.MessageBox(msg, _("Confirmación Final Requerida"), wx.YES_NO | wx.ICON_ERROR) != wx.YES:
+		if message_box(msg, _("Confirmación Final Requerida"), wx.YES_NO | wx.ICON_ERROR) != wx.YES:
 			return
 		try:
 			self.db_manager.clear_all_data()
@@ -409,20 +463,60 @@ class SettingsDialog(wx.Dialog):
 			mute(0.3, _("Todos los datos han sido eliminados."))
 			self.GetParent().display_items()
 		except Exception as e:
-			wx.MessageBox(
+			message_box(
 				_("Error: {0}").format(str(e)), _("Error"), wx.OK | wx.ICON_ERROR
 			)
 
 
+class ItemListCtrl(wx.ListCtrl):
+	# Lista virtual: el control solo pide el texto de las filas visibles.
+	def __init__(self, parent):
+		super(ItemListCtrl, self).__init__(parent, style=wx.LC_REPORT | wx.LC_SINGLE_SEL | wx.LC_VIRTUAL)
+		self.rows = []
+		self._row_index = None
+
+	def set_rows(self, rows):
+		# Cada fila es (id, título, categoría, valor), tal como la devuelve get_items.
+		self.DeleteAllItems()
+		self.rows = rows
+		self._row_index = None
+		self.SetItemCount(len(rows))
+		self.Refresh()
+
+	def find_index(self, item_id):
+		# El mapa id -> fila se construye la primera vez que se necesita tras cada set_rows.
+		if self._row_index is None:
+			self._row_index = {row[0]: index for index, row in enumerate(self.rows)}
+		return self._row_index.get(item_id, -1)
+
+	def get_row(self, index):
+		if 0 <= index < len(self.rows):
+			return self.rows[index]
+		return None
+
+	def get_selected_row(self):
+		return self.get_row(self.GetFirstSelected())
+
+	def OnGetItemText(self, item, column):
+		row = self.rows[item]
+		if column == 0:
+			return row[1]
+		return row[2] or UNCATEGORIZED
+
+
+@hook_methods("event", prefixes=("on_",), names=("display_items",))
 class LinkManager(wx.Dialog):
-	def __init__(self, parent, title, db_manager, db_path):
+	def __init__(self, parent, title, db_manager, db_path, db_worker):
 		super(LinkManager, self).__init__(parent, title=title, size=(600, 500))
 		self.db_manager = db_manager
 		self.db_path = db_path
+		self.db_worker = db_worker
+		self._query_generation = 0
+		# Solo se usa desde el hilo de db_worker.
+		self._search_cache = SearchCache(db_manager)
 		self.create_widgets()
 		self.bind_events()
 		self.display_items()
-		self.restore_focus()
 		self.CenterOnScreen()
 
 	def create_widgets(self):
@@ -434,7 +528,10 @@ class LinkManager(wx.Dialog):
 		search_label = wx.StaticText(self.panel, label=_("Buscar:"))
 		search_sizer.Add(search_label, 0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 5)
 		self.search_ctrl = wx.TextCtrl(self.panel)
-		search_sizer.Add(self.search_ctrl, 1, wx.EXPAND)
+		search_sizer.Add(self.search_ctrl, 1, wx.EXPAND | wx.RIGHT, 5)
+		# Translators: Casilla para activar la búsqueda aproximada, tolerante a errores de escritura.
+		self.fuzzy_checkbox = wx.CheckBox(self.panel, label=_("Búsqueda &aproximada"))
+		search_sizer.Add(self.fuzzy_checkbox, 0, wx.ALIGN_CENTER_VERTICAL)
 		main_sizer.Add(search_sizer, 0, wx.EXPAND | wx.ALL, 5)
 
 		self.controls_sizer = wx.BoxSizer(wx.HORIZONTAL)
@@ -443,7 +540,7 @@ class LinkManager(wx.Dialog):
 		self.controls_sizer.Add(filter_label, 0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 5)
 		# Translators: Opciones de filtro.
 		self.filter_choice = wx.Choice(self.panel, choices=[
-			_("Todos"), _("Enlaces"), _("Rutas"), _("Por Categoría")
+			_("Todos"), _("Enlaces"), _("Rutas"), _("Por Categoría"), _("Rutas rotas")
 		])
 		self.controls_sizer.Add(self.filter_choice, 1, wx.EXPAND | wx.RIGHT, 5)
 
@@ -462,12 +559,12 @@ class LinkManager(wx.Dialog):
 		self.sort_choice = wx.Choice(self.panel, choices=[
 			_("Alfabéticamente (A-Z)"), _("Alfabéticamente (Z-A)"),
 			_("Más recientes primero"), _("Más antiguos primero"),
-			_("Más usados"), _("Categoría (A-Z)"), _("Categoría (Z-A)")
+			_("Más usados"), _("Categoría (A-Z)"), _("Categoría (Z-A)"), _("Frecuentes y recientes")
 		])
 		self.controls_sizer.Add(self.sort_choice, 1, wx.EXPAND)
 		main_sizer.Add(self.controls_sizer, 0, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 5)
 
-		self.itemList = wx.ListCtrl(self.panel, style=wx.LC_REPORT | wx.LC_SINGLE_SEL)
+		self.itemList = ItemListCtrl(self.panel)
 		# Translators: Columna de título en la lista de elementos.
 		self.itemList.InsertColumn(0, _('Título'), width=350)
 		# Translators: Columna de categoría en la lista de elementos.
@@ -498,6 +595,7 @@ class LinkManager(wx.Dialog):
 		self.Bind(wx.EVT_CLOSE, self.on_hide)
 		self.search_ctrl.Bind(wx.EVT_TEXT, self.display_items)
 		self.search_ctrl.Bind(wx.EVT_KEY_DOWN, self.on_search_key_down)
+		self.fuzzy_checkbox.Bind(wx.EVT_CHECKBOX, self.display_items)
 		self.filter_choice.Bind(wx.EVT_CHOICE, self.on_filter_changed)
 		self.category_filter_choice.Bind(wx.EVT_CHOICE, self.display_items)
 		self.sort_choice.Bind(wx.EVT_CHOICE, self.display_items)
@@ -554,16 +652,16 @@ class LinkManager(wx.Dialog):
 		self.category_filter_choice.SetSelection(0)
 
 	def display_items(self, event=None):
-		self.itemList.DeleteAllItems()
-		filter_map = {0: 'all', 1: 'url', 2: 'path', 3: 'all'}
+		filter_map = {0: 'all', 1: 'url', 2: 'path', 3: 'all', 4: 'broken'}
 		sort_map = {
 			0: 'alpha_asc', 1: 'alpha_desc',
 			2: 'date_desc', 3: 'date_asc',
-			4: 'usage_desc', 5: 'category_asc', 6: 'category_desc'
+			4: 'usage_desc', 5: 'category_asc', 6: 'category_desc', 7: 'frecency_desc'
 		}
 		filter_by = filter_map.get(self.filter_choice.GetSelection(), 'all')
 		sort_by = sort_map.get(self.sort_choice.GetSelection(), 'alpha_asc')
 		search_term = self.search_ctrl.GetValue()
+		search_mode = 'fuzzy' if self.fuzzy_checkbox.IsChecked() else 'fts'
 
 		category_filter = None
 		if self.filter_choice.GetSelection() == 3 and self.category_filter_choice.GetCount() > 0:
@@ -571,13 +669,21 @@ class LinkManager(wx.Dialog):
 			if cat_sel > 0:
 				category_filter = self.category_filter_choice.GetString(cat_sel)
 
-		items = self.db_manager.get_items(
-			filter_by=filter_by, sort_by=sort_by,
-			category_filter=category_filter, search_term=search_term
+		# Cada petición lleva su generación; si el usuario sigue escribiendo, las anteriores se descartan.
+		self._query_generation += 1
+		generation = self._query_generation
+		self.db_worker.submit(
+			partial(
+				self._search_cache.get_items,
+				filter_by=filter_by, sort_by=sort_by,
+				category_filter=category_filter, search_term=search_term, search_mode=search_mode
+			),
+			on_success=self._show_items,
+			is_current=lambda: generation == self._query_generation
 		)
-		for title, category in items:
-			index = self.itemList.InsertItem(self.itemList.GetItemCount(), title)
-			self.itemList.SetItem(index, 1, category or UNCATEGORIZED)
+
+	def _show_items(self, items):
+		self.itemList.set_rows(items)
 		self.restore_focus()
 
 	def on_context_menu(self, event):
@@ -605,18 +711,16 @@ class LinkManager(wx.Dialog):
 		menu.Destroy()
 
 	def on_open_item_from_menu(self, event):
-		index = self.itemList.GetFirstSelected()
-		if index == -1:
+		row = self.itemList.get_selected_row()
+		if not row:
 			return
-		title = self.itemList.GetItemText(index)
-		self._open_item_by_title(title)
+		self._open_item(row[0])
 
 	def on_copy_to_clipboard(self, event):
-		index = self.itemList.GetFirstSelected()
-		if index == -1:
+		row = self.itemList.get_selected_row()
+		if not row:
 			return
-		title = self.itemList.GetItemText(index)
-		item = self.db_manager.get_item_by_title(title)
+		item = self.db_manager.get_item(row[0])
 		if item:
 			value = item[1]
 			if wx.TheClipboard.Open():
@@ -628,7 +732,7 @@ class LinkManager(wx.Dialog):
 	def on_add_item(self, event):
 		# Translators: Título del diálogo para añadir elemento.
 		with AddEditDialog(self, _("Añadir Elemento"), self.db_manager) as dlg:
-			if dlg.ShowModal() == wx.ID_OK:
+			if show_modal(dlg) == wx.ID_OK:
 				title, value, item_type, category = dlg.get_item_data()
 				self.db_manager.add_item(title, value, item_type, category)
 				self.display_items()
@@ -636,39 +740,38 @@ class LinkManager(wx.Dialog):
 				mute(0.3, _("Elemento '{0}' añadido.").format(title))
 
 	def on_edit_item(self, event):
-		index = self.itemList.GetFirstSelected()
-		if index == -1:
+		row = self.itemList.get_selected_row()
+		if not row:
 			return
-		title = self.itemList.GetItemText(index)
 		# Translators: Título del diálogo para editar elemento.
-		with AddEditDialog(self, _("Editar Elemento"), self.db_manager, item_title=title) as dlg:
-			if dlg.ShowModal() == wx.ID_OK:
+		with AddEditDialog(self, _("Editar Elemento"), self.db_manager, item_id=row[0]) as dlg:
+			if show_modal(dlg) == wx.ID_OK:
 				new_title, value, item_type, category = dlg.get_item_data()
-				self.db_manager.update_item(title, new_title, value, item_type, category)
+				self.db_manager.update_item(row[0], new_title, value, item_type, category)
 				self.display_items()
 				# Translators: Mensaje al editar un elemento.
 				mute(0.3, _("Elemento '{0}' actualizado.").format(new_title))
 
 	def on_delete_item(self, event):
-		index = self.itemList.GetFirstSelected()
-		if index == -1:
+		row = self.itemList.get_selected_row()
+		if not row:
 			return
-		title = self.itemList.GetItemText(index)
+		title = row[1]
 		if self.db_manager.get_setting("confirm_on_delete", "1") == "1":
 			# Translators: Confirmación de borrado de elemento.
-			if wx.MessageBox(
+			if message_box(
 				_("¿Borrar el elemento '{0}'?").format(title),
 				_("Confirmar"), wx.YES_NO | wx.ICON_QUESTION
 			) != wx.YES:
 				return
-		self.db_manager.delete_item(title)
+		self.db_manager.delete_item(row[0])
 		self.display_items()
 		# Translators: Mensaje al borrar un elemento.
 		mute(0.3, _("Elemento '{0}' borrado.").format(title))
 
-	def _open_item_by_title(self, title):
-		self.db_manager.increment_usage_count(title)
-		item = self.db_manager.get_item_by_title(title)
+	def _open_item(self, item_id):
+		self.db_manager.increment_usage_count(item_id)
+		item = self.db_manager.get_item(item_id)
 		if not item:
 			return
 		_t, value, item_type, _c = item
@@ -684,29 +787,26 @@ class LinkManager(wx.Dialog):
 				os.startfile(clean_value)
 		except Exception as e:
 			# Translators: Error al abrir un elemento.
-			wx.MessageBox(
+			message_box(
 				_("Error al abrir '{0}': {1}").format(value, str(e)),
 				_("Error"), wx.OK | wx.ICON_ERROR
 			)
-		if self.sort_choice.GetSelection() == 4:
-			self.display_items()
 
 	def on_open_item(self, event):
-		title = event.GetText()
-		self._open_item_by_title(title)
+		row = self.itemList.get_row(event.GetIndex())
+		if row:
+			self._open_item(row[0])
 
 	def on_item_selected(self, event):
-		title = event.GetText()
-		item = self.db_manager.get_item_by_title(title)
-		if item:
-			value = item[1]
-			self.status_text.SetLabel(value)
-			self.db_manager.set_setting("last_focused", title)
+		row = self.itemList.get_row(event.GetIndex())
+		if row:
+			self.status_text.SetLabel(row[3])
+			self.db_manager.defer_setting("last_focused", str(row[0]))
 
 	def on_settings(self, event):
 		# Translators: Título del diálogo de configuración.
-		with SettingsDialog(self, _("Configuración"), self.db_manager, self.db_path) as dlg:
-			dlg.ShowModal()
+		with SettingsDialog(self, _("Configuración"), self.db_manager, self.db_path, self.db_worker) as dlg:
+			show_modal(dlg)
 		self.display_items()
 
 	def on_item_list_key_down(self, event):
@@ -722,23 +822,24 @@ class LinkManager(wx.Dialog):
 
 	def restore_focus(self):
 		last_focused = self.db_manager.get_setting("last_focused")
-		if not last_focused:
+		if not last_focused or not last_focused.isdigit():
+			# Las versiones anteriores guardaban el título en lugar del id.
 			return
-		for i in range(self.itemList.GetItemCount()):
-			if self.itemList.GetItemText(i) == last_focused:
-				self.itemList.SetItemState(
-					i, wx.LIST_STATE_SELECTED | wx.LIST_STATE_FOCUSED,
-					wx.LIST_STATE_SELECTED | wx.LIST_STATE_FOCUSED
-				)
-				self.itemList.EnsureVisible(i)
-				break
+		index = self.itemList.find_index(int(last_focused))
+		if index == -1:
+			return
+		self.itemList.SetItemState(
+			index, wx.LIST_STATE_SELECTED | wx.LIST_STATE_FOCUSED,
+			wx.LIST_STATE_SELECTED | wx.LIST_STATE_FOCUSED
+		)
+		self.itemList.EnsureVisible(index)
 
 	def add_from_context(self, current_title, current_value):
 		# Translators: Título del diálogo al añadir desde contexto.
 		with AddEditDialog(self, _("Añadir desde Contexto"), self.db_manager) as dlg:
 			dlg.txtTitle.SetValue(current_title)
 			dlg.txtValue.SetValue(current_value)
-			if dlg.ShowModal() == wx.ID_OK:
+			if show_modal(dlg) == wx.ID_OK:
 				title, value, item_type, category = dlg.get_item_data()
 				self.db_manager.add_item(title, value, item_type, category)
 				self.display_items()
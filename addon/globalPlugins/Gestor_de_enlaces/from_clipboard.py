@@ -7,18 +7,80 @@ import api
 import wx
 import webbrowser as wb
 import re
+from functools import partial
 from ui import message, reportTextCopiedToClipboard
+from .dialogs import validateInput, mute, UNCATEGORIZED
+from .hooks import hook_methods, call_after, show_modal, message_box
 
-# Expresión regular para extraer URLs
-url_re = re.compile(r"(?:\w+://|www\.)[^ ,.\?!#%=+\[\]{}\"\'()\\]+[^ \r]*")
+# Límites del escaneo del portapapeles: caracteres leídos y enlaces devueltos.
+MAX_SCAN_CHARS = 4 * 1024 * 1024
+MAX_URLS = 1000
+# Longitud máxima del esquema (http, ftp...) que se busca hacia atrás desde "://".
+MAX_SCHEME_LENGTH = 32
+
+# Solo se buscan anclas literales; el resto del enlace se recorre una vez, sin retroceso.
+_anchor_re = re.compile(r"://|www\.")
+_space_re = re.compile(r"\s")
+# Caracteres que no pueden ir justo después del ancla.
+bad_first_chars = frozenset(' ,.?!#%=+[]{}"\'()\\')
 bad_chars = '\'\\.,[](){}:;"'
 
+def _is_word_char(char):
+	return char.isalnum() or char == "_"
+
+def iter_urls(text, max_chars=MAX_SCAN_CHARS, max_urls=MAX_URLS):
+	"""Genera las URLs del texto, sin repetir, en tiempo lineal respecto a su longitud."""
+	if len(text) > max_chars:
+		text = text[:max_chars]
+	seen = set()
+	end = 0
+	for anchor in _anchor_re.finditer(text):
+		start = anchor.start()
+		if start < end:
+			continue
+		if anchor.group() == "://":
+			limit = max(0, start - MAX_SCHEME_LENGTH - 1)
+			while start > limit and _is_word_char(text[start - 1]):
+				start -= 1
+			if not 0 < anchor.start() - start <= MAX_SCHEME_LENGTH:
+				continue
+		body = anchor.end()
+		if body >= len(text) or text[body] in bad_first_chars or text[body].isspace():
+			continue
+		space = _space_re.search(text, body)
+		end = space.start() if space else len(text)
+		url = text[start:end].strip(bad_chars)
+		if url and url not in seen:
+			seen.add(url)
+			yield url
+			if len(seen) >= max_urls:
+				return
+
 def extract_urls(text):
 	"""Extrae y limpia URLs desde texto plano"""
-	return [s.strip(bad_chars) for s in url_re.findall(text)]
+	return list(iter_urls(text))
+
+def save_links(db_manager, links, category):
+	"""Valida los enlaces y guarda los válidos en category; devuelve (añadidos, omitidos, no válidos).
 
+	Valida rutas, que pueden estar en unidades lentas, así que se ejecuta en el hilo de la base de datos.
+	"""
+	items = []
+	invalid = 0
+	for link in links:
+		is_valid, item_type = validateInput(link)
+		if is_valid:
+			items.append((link, link, item_type))
+		else:
+			invalid += 1
+	added, skipped = db_manager.add_items(items, category)
+	return added, skipped, invalid
+
+@hook_methods("event", prefixes=("On",))
 class FromClipboard(wx.Dialog):
-	def __init__(self, parent):
+	def __init__(self, parent, db_manager=None, db_worker=None):
+		self.db_manager = db_manager
+		self.db_worker = db_worker
 		try:
 			clip = api.getClipData()
 			links = extract_urls(clip)
@@ -40,13 +102,17 @@ class FromClipboard(wx.Dialog):
 		openUrl.Bind(wx.EVT_BUTTON, self.OnOpen)
 		copy = wx.Button(p, -1, _("copy to clipboard"))
 		copy.Bind(wx.EVT_BUTTON, self.OnCopy)
+		if db_manager is not None and db_worker is not None:
+			# Translators: Botón para guardar en una categoría todos los enlaces del portapapeles.
+			saveAll = wx.Button(p, -1, _("&Guardar todos..."))
+			saveAll.Bind(wx.EVT_BUTTON, self.OnSaveAll)
 		close = wx.Button(p, wx.ID_CANCEL, _("close"))
 
 		for link in links:
 			self.linksList.Append(link)
 
 		self.linksList.Selection = 0
-		wx.CallAfter(self.Show)
+		call_after(self.Show)
 
 	def OnOpen(self, event):
 		message(_("opening {url}").format(url=self.linksList.StringSelection))
@@ -54,4 +120,30 @@ class FromClipboard(wx.Dialog):
 
 	def OnCopy(self, event):
 		if api.copyToClip(self.linksList.StringSelection):
-			reportTextCopiedToClipboard(self.linksList.StringSelection)
\ No newline at end of file
+			reportTextCopiedToClipboard(self.linksList.StringSelection)
+
+	def OnSaveAll(self, event):
+		categories = self.db_manager.get_all_categories()
+		if UNCATEGORIZED not in categories:
+			categories.insert(0, UNCATEGORIZED)
+		# Translators: Diálogo para elegir la categoría donde guardar todos los enlaces.
+		with wx.SingleChoiceDialog(self, _("Categoría:"), _("Guardar todos los enlaces"), categories) as dlg:
+			if show_modal(dlg) != wx.ID_OK:
+				return
+			category = dlg.GetStringSelection()
+		self.db_worker.submit(
+			partial(save_links, self.db_manager, self.linksList.GetItems(), category),
+			on_success=self._on_save_all_success,
+			on_error=self._on_save_all_error
+		)
+
+	# Se entregan en el hilo de wx, quizá con el diálogo ya cerrado: no lo tocan.
+	def _on_save_all_success(self, counts):
+		added, skipped, invalid = counts
+		# Translators: Resumen al guardar todos los enlaces del portapapeles.
+		mute(0.3, _("{added} nuevos, {skipped} ya existían, {invalid} no válidos.").format(
+			added=added, skipped=skipped, invalid=invalid
+		))
+
+	def _on_save_all_error(self, error):
+		message_box(_("Error: {0}").format(str(error)), _("Error"), wx.OK | wx.ICON_ERROR)
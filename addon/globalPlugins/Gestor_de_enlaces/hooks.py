@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# Gestor de enlaces - Puntos de entrada observables
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2024 Ayoub El Bakhti
+
+import functools
+import time
+import wx
+
+# Observadores activos. Cada uno tiene enter(kind, name), que devuelve un testigo, y exit(testigo);
+# opcionalmente queued(name, delay), con los segundos que esperó en la cola lo encolado con call_after,
+# y pause(), que devuelve un testigo, y resume(testigo), alrededor de cada bucle modal de run_modal.
+# Mientras la lista está vacía los envoltorios solo añaden una comprobación.
+_observers = []
+
+
+def add_observer(observer):
+	if observer not in _observers:
+		_observers.append(observer)
+
+
+def remove_observer(observer):
+	if observer in _observers:
+		_observers.remove(observer)
+
+
+def describe(func):
+	# Un partial con __qualname__ propio (functools.update_wrapper) se nombra como la función que envuelve.
+	while isinstance(func, functools.partial) and not hasattr(func, "__qualname__"):
+		func = func.func
+	return getattr(func, "__qualname__", None) or getattr(func, "__name__", None) or repr(func)
+
+
+def run(kind, name, func, *args, **kwargs):
+	"""Ejecuta func avisando a los observadores de que se entra y se sale de un punto de entrada."""
+	if not _observers:
+		return func(*args, **kwargs)
+	entered = []
+	for observer in tuple(_observers):
+		entered.append((observer, observer.enter(kind, name)))
+	try:
+		return func(*args, **kwargs)
+	finally:
+		for observer, token in reversed(entered):
+			observer.exit(token)
+
+
+def entry_point(kind, func):
+	@functools.wraps(func)
+	def wrapper(*args, **kwargs):
+		if not _observers:
+			return func(*args, **kwargs)
+		return run(kind, wrapper.__qualname__, func, *args, **kwargs)
+
+	return wrapper
+
+
+def hook_methods(kind, prefixes=(), names=()):
+	"""Decorador de clase: convierte en puntos de entrada los métodos con esos prefijos o nombres.
+
+	functools.wraps conserva los atributos que @script pone en las funciones.
+	"""
+	def decorator(cls):
+		for name, value in list(vars(cls).items()):
+			if callable(value) and (name in names or name.startswith(tuple(prefixes))):
+				setattr(cls, name, entry_point(kind, value))
+		return cls
+
+	return decorator
+
+
+def call_after(func, *args, **kwargs):
+	# wx.CallAfter para el código del complemento: lo encolado también es un punto de entrada.
+	if not _observers:
+		wx.CallAfter(func, *args, **kwargs)
+		return
+	wx.CallAfter(_run_queued, time.perf_counter(), describe(func), func, *args, **kwargs)
+
+
+def _run_queued(posted, name, func, *args, **kwargs):
+	delay = time.perf_counter() - posted
+	for observer in tuple(_observers):
+		queued = getattr(observer, "queued", None)
+		if queued is not None:
+			queued(name, delay)
+	return run("call_after", name, func, *args, **kwargs)
+
+
+def run_modal(func, *args, **kwargs):
+	"""Ejecuta func, que abre un bucle modal (ShowModal, wx.MessageBox), con los puntos de entrada en pausa.
+
+	Mientras el bucle espera al usuario el hilo principal no está bloqueado, y los eventos que despacha
+	son puntos de entrada nuevos, no parte del que abrió el diálogo.
+	"""
+	if not _observers:
+		return func(*args, **kwargs)
+	paused = []
+	for observer in tuple(_observers):
+		pause = getattr(observer, "pause", None)
+		if pause is not None:
+			paused.append((observer, pause()))
+	try:
+		return func(*args, **kwargs)
+	finally:
+		for observer, token in reversed(paused):
+			observer.resume(token)
+
+
+def show_modal(dialog):
+	return run_modal(dialog.ShowModal)
+
+
+def message_box(*args, **kwargs):
+	return run_modal(wx.MessageBox, *args, **kwargs)
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+# Gestor de enlaces - Medición de tiempos de la base de datos
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2024 Ayoub El Bakhti
+
+import os
+import threading
+import time
+from collections import deque
+import addonHandler
+
+addonHandler.initTranslation()
+
+# Duraciones que se guardan por método para calcular percentiles.
+SAMPLES_PER_METHOD = 512
+# Llamadas que tardan más (segundos) se apuntan en el registro de consultas lentas.
+SLOW_CALL_THRESHOLD = 0.1
+# Sentencias SQL que se guardan por llamada y caracteres por sentencia.
+MAX_STATEMENTS_PER_CALL = 50
+MAX_STATEMENT_LENGTH = 2000
+# Al superar este tamaño el registro se renombra a .1 y se empieza otro.
+SLOW_LOG_MAX_BYTES = 1024 * 1024
+SUMMARY_TOP_METHODS = 5
+# Métodos que no se miden: abren o cierran la conexión que se está observando.
+EXCLUDED_METHODS = ("close", "reconnect")
+
+
+def _percentile(sorted_values, fraction):
+	if not sorted_values:
+		return 0.0
+	index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+	return sorted_values[index]
+
+
+class _MethodStats:
+	__slots__ = ("calls", "rows", "changes", "commits", "slow", "total", "durations")
+
+	def __init__(self):
+		self.calls = 0
+		self.rows = 0
+		self.changes = 0
+		self.commits = 0
+		self.slow = 0
+		self.total = 0.0
+		self.durations = deque(maxlen=SAMPLES_PER_METHOD)
+
+
+class _Call:
+	__slots__ = ("name", "start", "statements", "commits")
+
+	def __init__(self, name, start):
+		self.name = name
+		self.start = start
+		self.statements = []
+		self.commits = 0
+
+
+class DBInstrumentation:
+	"""Mide tiempos, filas y commits de cada método público de un DatabaseManager.
+
+	Al activarse pone en la instancia un envoltorio por método y un trace callback en la conexión;
+	al desactivarse los quita, así que apagada no cuesta nada. Las llamadas lentas se apuntan con
+	su SQL (ya con los parámetros sustituidos) en log_path.
+	"""
+
+	def __init__(self, db_manager, log_path, threshold=SLOW_CALL_THRESHOLD):
+		self.db_manager = db_manager
+		self.log_path = log_path
+		self.threshold = threshold
+		self.enabled = False
+		self._stats = {}
+		self._lock = threading.Lock()
+		self._log_lock = threading.Lock()
+		self._local = threading.local()
+		self._traced_conn = None
+
+	def enable(self):
+		if self.enabled:
+			return
+		for name in dir(type(self.db_manager)):
+			if name.startswith("_") or name in EXCLUDED_METHODS:
+				continue
+			method = getattr(self.db_manager, name)
+			if callable(method):
+				setattr(self.db_manager, name, self._wrap(name, method))
+		self.enabled = True
+		self._attach_trace()
+
+	def disable(self):
+		if not self.enabled:
+			return
+		self.enabled = False
+		for name in list(vars(self.db_manager)):
+			if getattr(vars(self.db_manager)[name], "_instrumented", False):
+				delattr(self.db_manager, name)
+		conn = self._traced_conn
+		self._traced_conn = None
+		if conn is not None and conn is self.db_manager.conn:
+			conn.set_trace_callback(None)
+
+	def toggle(self):
+		if self.enabled:
+			self.disable()
+		else:
+			self.enable()
+		return self.enabled
+
+	def reset(self):
+		with self._lock:
+			self._stats.clear()
+
+	def _attach_trace(self):
+		# reconnect() crea una conexión nueva; se vuelve a enganchar en la siguiente llamada.
+		conn = self.db_manager.conn
+		if conn is not None and conn is not self._traced_conn:
+			conn.set_trace_callback(self._on_statement)
+			self._traced_conn = conn
+
+	def _on_statement(self, sql):
+		stack = getattr(self._local, "stack", None)
+		if not stack:
+			return
+		offset = time.perf_counter()
+		# Los commits se atribuyen a la llamada más externa, para no contarlos dos veces en los totales.
+		if sql == "COMMIT":
+			stack[0].commits += 1
+		for call in stack:
+			if len(call.statements) < MAX_STATEMENTS_PER_CALL:
+				call.statements.append((offset - call.start, sql))
+
+	def _wrap(self, name, method):
+		def wrapper(*args, **kwargs):
+			if self._traced_conn is not self.db_manager.conn:
+				self._attach_trace()
+			stack = getattr(self._local, "stack", None)
+			if stack is None:
+				stack = self._local.stack = []
+			conn = self.db_manager.conn
+			changes_before = conn.total_changes if conn is not None else 0
+			call = _Call(name, time.perf_counter())
+			stack.append(call)
+			try:
+				result = method(*args, **kwargs)
+			finally:
+				stack.pop()
+				duration = time.perf_counter() - call.start
+				conn = self.db_manager.conn
+				changes = 0
+				if not stack and conn is not None:
+					changes = conn.total_changes - changes_before
+				self._record(call, duration, changes)
+			if isinstance(result, list):
+				with self._lock:
+					self._stats[name].rows += len(result)
+			return result
+
+		wrapper._instrumented = True
+		wrapper.__name__ = name
+		wrapper.__doc__ = method.__doc__
+		return wrapper
+
+	def _record(self, call, duration, changes):
+		slow = duration >= self.threshold
+		with self._lock:
+			stats = self._stats.get(call.name)
+			if stats is None:
+				stats = self._stats[call.name] = _MethodStats()
+			stats.calls += 1
+			stats.total += duration
+			stats.changes += max(changes, 0)
+			stats.commits += call.commits
+			stats.durations.append(duration)
+			if slow:
+				stats.slow += 1
+		if slow:
+			self._write_slow_call(call, duration, changes)
+
+	def _write_slow_call(self, call, duration, changes):
+		lines = [
+			f"{time.strftime('%Y-%m-%d %H:%M:%S')} {call.name} {duration * 1000:.1f} ms"
+			f" hilo={threading.current_thread().name} cambios={changes} commits={call.commits}"
+		]
+		for offset, sql in call.statements:
+			lines.append(f"\t+{offset * 1000:.1f} ms  {' '.join(sql.split())[:MAX_STATEMENT_LENGTH]}")
+		try:
+			with self._log_lock:
+				if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > SLOW_LOG_MAX_BYTES:
+					os.replace(self.log_path, self.log_path + ".1")
+				with open(self.log_path, "a", encoding="utf-8") as f:
+					f.write("\n".join(lines) + "\n")
+		except OSError as e:
+			from logHandler import log
+			log.warning(f"Gestor de Enlaces: No se pudo escribir el registro de consultas lentas: {e}")
+
+	def snapshot(self):
+		"""Devuelve {método: dict con calls, rows, changes, commits, slow, total, p50, p95, p99}."""
+		with self._lock:
+			items = [(name, stats, sorted(stats.durations)) for name, stats in self._stats.items()]
+		result = {}
+		for name, stats, durations in items:
+			result[name] = {
+				"calls": stats.calls, "rows": stats.rows, "changes": stats.changes, "commits": stats.commits,
+				"slow": stats.slow, "total": stats.total,
+				"p50": _percentile(durations, 0.5), "p95": _percentile(durations, 0.95),
+				"p99": _percentile(durations, 0.99),
+			}
+		return result
+
+	def summary(self):
+		snapshot = self.snapshot()
+		if not snapshot:
+			# Translators: Resumen de rendimiento cuando todavía no hay mediciones.
+			return _("Sin mediciones de la base de datos.")
+		calls = sum(stats["calls"] for stats in snapshot.values())
+		slow = sum(stats["slow"] for stats in snapshot.values())
+		commits = sum(stats["commits"] for stats in snapshot.values())
+		# Translators: Primera línea del resumen de rendimiento de la base de datos.
+		lines = [_("{calls} llamadas, {slow} lentas, {commits} commits.").format(
+			calls=calls, slow=slow, commits=commits
+		)]
+		ranked = sorted(snapshot.items(), key=lambda entry: entry[1]["total"], reverse=True)
+		# Translators: Una línea del resumen de rendimiento por cada método de la base de datos.
+		method_line = _(
+			"{name}: {calls} llamadas, p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms, "
+			"{rows} filas, {changes} cambios, {commits} commits."
+		)
+		for name, stats in ranked[:SUMMARY_TOP_METHODS]:
+			lines.append(method_line.format(
+				name=name, calls=stats["calls"], p50=stats["p50"] * 1000, p95=stats["p95"] * 1000,
+				p99=stats["p99"] * 1000, rows=stats["rows"], changes=stats["changes"], commits=stats["commits"]
+			))
+		return "\n".join(lines)
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# Gestor de enlaces - Índice para la navegación virtual
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2024 Ayoub El Bakhti
+
+
+class NavigationIndex:
+	def __init__(self, db_manager, uncategorized):
+		self.db_manager = db_manager
+		self.uncategorized = uncategorized
+		self.links = []
+		self.categories = []
+		self._links_by_category = {}
+		self._version = None
+
+	def refresh(self):
+		# Solo se reconstruye cuando la base de datos ha cambiado desde la última vez.
+		version = self.db_manager.change_counter
+		if version == self._version:
+			return False
+		links = []
+		links_by_category = {}
+		for title, value, _item_type, cat_name in self.db_manager.get_all_items_for_nav():
+			link = (title, value, cat_name or self.uncategorized)
+			links.append(link)
+			links_by_category.setdefault(link[2], []).append(link)
+		for cat_name in self.db_manager.get_all_categories():
+			links_by_category.setdefault(cat_name, [])
+		self.links = links
+		self._links_by_category = links_by_category
+		self.categories = sorted(links_by_category, key=lambda s: s.lower())
+		self._version = version
+		return True
+
+	def get_links(self, category=None):
+		if category is None:
+			return self.links
+		return self._links_by_category.get(category, [])
+
+	def get_count(self, category):
+		return len(self._links_by_category.get(category, ()))
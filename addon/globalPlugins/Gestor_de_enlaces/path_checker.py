@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+# Gestor de enlaces - Comprobación de rutas sin bloquear
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2024 Ayoub El Bakhti
+
+import os
+import queue
+import threading
+import time
+
+# Segundos que se espera a os.path.exists antes de dar la ruta por desconocida.
+PATH_CHECK_TIMEOUT = 1.0
+# Segundos que se reutiliza un resultado.
+PATH_CACHE_TTL = 60.0
+# Entradas a partir de las cuales se purgan las caducadas.
+PATH_CACHE_MAX_ENTRIES = 256
+# Hilos que comprueban rutas, compartidos por los diálogos y la revisión en segundo plano, y comprobaciones
+# que pueden estar en cola o en marcha a la vez; por encima de eso la ruta se da por desconocida sin esperar.
+PATH_CHECK_WORKERS = 4
+PATH_CHECK_MAX_PENDING = 256
+
+# Revisión en segundo plano de los elementos de tipo ruta.
+HEALTH_CHECK_BATCH = 64
+# Segundos antes de la primera revisión, entre revisiones y antes de volver a comprobar una ruta.
+HEALTH_FIRST_DELAY = 30.0
+HEALTH_SCAN_INTERVAL = 15 * 60.0
+HEALTH_RECHECK_AGE = 24 * 60 * 60.0
+
+
+class PathExistenceService:
+	"""Comprueba si existen rutas en un grupo fijo de hilos, con tiempo límite y caché.
+
+	Una unidad de red caída o un disco desconectado pueden dejar os.path.exists colgado varios segundos;
+	así quien llama espera como mucho el tiempo límite. La comprobación sigue en segundo plano y su
+	resultado queda en caché para la siguiente vez. Las rutas colgadas ocupan como mucho
+	PATH_CHECK_WORKERS hilos.
+	"""
+
+	def __init__(self, timeout=PATH_CHECK_TIMEOUT, ttl=PATH_CACHE_TTL, workers=PATH_CHECK_WORKERS):
+		self.timeout = timeout
+		self.ttl = ttl
+		self.workers = workers
+		self._lock = threading.Lock()
+		self._cache = {}
+		self._in_flight = {}
+		self._queue = queue.Queue()
+		self._threads = []
+
+	def exists(self, path, timeout=None):
+		# Devuelve True o False, o None si la comprobación no terminó a tiempo.
+		result, done = self._start(path)
+		if done is None or not done.wait(self.timeout if timeout is None else timeout):
+			return result
+		return self._result(path)
+
+	def exists_many(self, paths, timeout=None):
+		# Como exists, pero lanza todas las comprobaciones a la vez y espera como mucho timeout en total.
+		started = [(path, self._start(path)) for path in paths]
+		deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+		results = {}
+		for path, (result, done) in started:
+			if done is not None and done.wait(max(deadline - time.monotonic(), 0)):
+				result = self._result(path)
+			results[path] = result
+		return results
+
+	def _start(self, path):
+		# Devuelve (resultado en caché, None) o (None, evento de la comprobación en curso).
+		now = time.monotonic()
+		with self._lock:
+			cached = self._cache.get(path)
+			if cached is not None and cached[1] > now:
+				return cached[0], None
+			done = self._in_flight.get(path)
+			if done is None:
+				if len(self._in_flight) >= PATH_CHECK_MAX_PENDING:
+					return None, None
+				done = self._in_flight[path] = threading.Event()
+				self._queue.put((path, done))
+				# Hilos daemon, como el de la base de datos: uno colgado no retrasa la salida de NVDA.
+				if len(self._threads) < self.workers:
+					thread = threading.Thread(target=self._run, name="GestorDeEnlacesPath", daemon=True)
+					self._threads.append(thread)
+					thread.start()
+		return None, done
+
+	def _run(self):
+		while True:
+			path, done = self._queue.get()
+			self._check(path, done)
+
+	def _result(self, path):
+		with self._lock:
+			cached = self._cache.get(path)
+		return cached[0] if cached is not None else None
+
+	def _check(self, path, done):
+		try:
+			result = os.path.exists(path)
+		except Exception:
+			result = False
+		with self._lock:
+			if len(self._cache) >= PATH_CACHE_MAX_ENTRIES:
+				now = time.monotonic()
+				self._cache = {key: entry for key, entry in self._cache.items() if entry[1] > now}
+				while len(self._cache) >= PATH_CACHE_MAX_ENTRIES:
+					del self._cache[next(iter(self._cache))]
+			self._cache[path] = (result, time.monotonic() + self.ttl)
+			del self._in_flight[path]
+		done.set()
+
+	def invalidate(self, path=None):
+		with self._lock:
+			if path is None:
+				self._cache.clear()
+			else:
+				self._cache.pop(path, None)
+
+
+path_service = PathExistenceService()
+
+
+class PathHealthScanner:
+	"""Comprueba periódicamente las rutas guardadas, empezando por las que hace más que no se miran."""
+
+	def __init__(self, db_manager, service=None):
+		self.db_manager = db_manager
+		self.service = service or path_service
+		self._stop = threading.Event()
+		self._thread = None
+
+	def start(self):
+		self._thread = threading.Thread(target=self._run, name="GestorDeEnlacesHealth", daemon=True)
+		self._thread.start()
+
+	def stop(self, timeout=2.0):
+		self._stop.set()
+		if self._thread is not None:
+			self._thread.join(timeout)
+
+	def _run(self):
+		delay = HEALTH_FIRST_DELAY
+		while not self._stop.wait(delay):
+			try:
+				self.scan()
+			except Exception as e:
+				from logHandler import log
+				log.error(f"Gestor de Enlaces: Error al comprobar rutas: {e}")
+			delay = HEALTH_SCAN_INTERVAL
+
+	def scan(self):
+		# Por lotes, para poder parar entre uno y otro. Las comprobaciones van al grupo de hilos del
+		# servicio y cada lote espera como mucho su tiempo límite. Las rutas sin respuesta se quedan sin
+		# marcar, para la próxima revisión, y se saltan en esta: siguen siendo las primeras de la consulta.
+		checked = 0
+		unanswered = 0
+		while not self._stop.is_set():
+			rows = self.db_manager.get_paths_to_check(
+				time.time() - HEALTH_RECHECK_AGE, HEALTH_CHECK_BATCH, offset=unanswered
+			)
+			if not rows:
+				break
+			exists = self.service.exists_many({path for _item_id, path in rows})
+			results = [(item_id, exists[path]) for item_id, path in rows]
+			self.db_manager.set_path_health(results, time.time())
+			answered = sum(1 for _item_id, ok in results if ok is not None)
+			unanswered += len(results) - answered
+			checked += answered
+		return checked
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+# Gestor de enlaces - Perfiles de rendimiento bajo demanda
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2024 Ayoub El Bakhti
+
+import cProfile
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from . import hooks
+
+# Segundos entre dos muestras de pila para el archivo de flamegraph.
+SAMPLE_INTERVAL = 0.005
+MAX_STACK_DEPTH = 64
+TOP_FUNCTIONS = 5
+
+# pstats nombra las funciones internas como "<method 'fetchall' of 'sqlite3.Cursor' objects>".
+_builtin_method_re = re.compile(r"<method '(\w+)' of '([\w.]+)' objects>")
+_builtin_function_re = re.compile(r"<built-in method ([\w.]+)>")
+
+
+def _frame_label(code):
+	return f"{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}"
+
+
+def _function_label(filename, line, name):
+	if line:
+		return f"{os.path.basename(filename)}:{name}:{line}"
+	match = _builtin_method_re.fullmatch(name)
+	if match:
+		return f"{match.group(2)}.{match.group(1)}"
+	match = _builtin_function_re.fullmatch(name)
+	return match.group(1) if match else name
+
+
+class SessionProfiler:
+	"""Perfila los puntos de entrada del complemento (scripts, eventos de wx y tareas de base de datos).
+
+	Cada hilo tiene su propio cProfile, activo solo mientras el hilo está dentro de un punto de entrada.
+	Un hilo aparte toma muestras de esas pilas para el archivo de pilas plegadas (flamegraph).
+	"""
+
+	def __init__(self, output_dir):
+		self.output_dir = output_dir
+		self.running = False
+		self._local = threading.local()
+		self._profiles = {}
+		# Hilo -> punto de entrada en el que está; lo lee el muestreador.
+		self._active = {}
+		self._samples = Counter()
+		self._stop_sampling = threading.Event()
+		self._sampler = None
+
+	def start(self):
+		if self.running:
+			return
+		self._profiles = {}
+		self._active = {}
+		self._samples = Counter()
+		self._stop_sampling.clear()
+		self._sampler = threading.Thread(target=self._sample, name="GestorDeEnlacesProfiler", daemon=True)
+		self._sampler.start()
+		self.running = True
+		hooks.add_observer(self)
+
+	def enter(self, kind, name):
+		depth = getattr(self._local, "depth", 0)
+		self._local.depth = depth + 1
+		if depth or not self.running:
+			return None
+		thread_id = threading.get_ident()
+		profile = self._profiles.get(thread_id)
+		if profile is None:
+			profile = self._profiles[thread_id] = cProfile.Profile()
+		try:
+			profile.enable()
+		except ValueError:
+			# Desde Python 3.12 solo puede haber un perfilador activo a la vez.
+			profile = None
+		self._active[thread_id] = f"{kind}:{name}"
+		return profile
+
+	def exit(self, profile):
+		self._local.depth -= 1
+		if self._local.depth:
+			return
+		if profile is not None:
+			profile.disable()
+		self._active.pop(threading.get_ident(), None)
+
+	def _sample(self):
+		hooks_file = hooks.__file__
+		while not self._stop_sampling.wait(SAMPLE_INTERVAL):
+			if not self._active:
+				continue
+			frames = sys._current_frames()
+			for thread_id, entry in list(self._active.items()):
+				# Se recorre la pila hasta el punto de entrada más externo; los marcos de hooks no se apuntan.
+				stack = []
+				inside = []
+				frame = frames.get(thread_id)
+				while frame is not None:
+					code = frame.f_code
+					if code.co_filename == hooks_file:
+						inside = stack[:]
+					else:
+						stack.append(_frame_label(code))
+					frame = frame.f_back
+				inside = inside[-MAX_STACK_DEPTH:]
+				inside.append(entry)
+				self._samples[";".join(reversed(inside))] += 1
+
+	def stop(self):
+		"""Para el perfil, guarda los archivos y devuelve (ruta sin extensión, funciones más costosas)."""
+		if not self.running:
+			return None, []
+		self.running = False
+		hooks.remove_observer(self)
+		self._stop_sampling.set()
+		self._sampler.join()
+		# El hilo que para el perfil puede estar dentro de un punto de entrada: su perfil se cierra aquí.
+		current = self._profiles.get(threading.get_ident())
+		if current is not None:
+			current.disable()
+		profiles = [
+			profile for thread_id, profile in self._profiles.items()
+			if thread_id not in self._active or thread_id == threading.get_ident()
+		]
+		os.makedirs(self.output_dir, exist_ok=True)
+		base_path = os.path.join(self.output_dir, "perfil_" + time.strftime("%Y%m%d_%H%M%S"))
+		top = []
+		stats = None
+		for profile in profiles:
+			profile.create_stats()
+			if not profile.stats:
+				continue
+			if stats is None:
+				stats = pstats.Stats(profile)
+			else:
+				stats.add(profile)
+		if stats is not None:
+			stats.dump_stats(base_path + ".prof")
+			top = self._top_functions(stats)
+		with open(base_path + ".folded", "w", encoding="utf-8") as f:
+			for stack, count in sorted(self._samples.items()):
+				f.write(f"{stack} {count}\n")
+		return base_path, top
+
+	@staticmethod
+	def _top_functions(stats):
+		# Por tiempo propio, sin contar las funciones de este módulo ni las de hooks.
+		own_files = (os.path.abspath(__file__), os.path.abspath(hooks.__file__))
+		entries = [
+			(values[2], func) for func, values in stats.stats.items()
+			if os.path.abspath(func[0]) not in own_files
+		]
+		entries.sort(reverse=True)
+		return [
+			(_function_label(*func), own_time) for own_time, func in entries[:TOP_FUNCTIONS]
+		]
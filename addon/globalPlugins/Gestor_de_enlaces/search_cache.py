@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# Gestor de enlaces - Caché de resultados de búsqueda
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2024 Ayoub El Bakhti
+
+from collections import OrderedDict
+
+
+class SearchCache:
+	"""Caché LRU delante de DatabaseManager.get_items.
+
+	Si el término nuevo amplía uno ya cacheado con los mismos filtros, el resultado se obtiene
+	filtrando en memoria el anterior en lugar de volver a consultar SQLite.
+	"""
+
+	def __init__(self, db_manager, max_entries=16):
+		self.db_manager = db_manager
+		self.max_entries = max_entries
+		self._entries = OrderedDict()
+		self._version = None
+
+	def get_items(
+			self, filter_by='all', sort_by='alpha_asc', category_filter=None, search_term=None, search_mode='fts'
+	):
+		version = self.db_manager.change_counter
+		if version != self._version:
+			self._entries.clear()
+			self._version = version
+		search_term = search_term or ""
+		key = (filter_by, sort_by, category_filter, search_mode, search_term)
+		rows = self._entries.get(key)
+		if rows is not None:
+			self._entries.move_to_end(key)
+			return rows
+		base_rows = self._find_narrowable(key)
+		if base_rows is not None:
+			matches = self.db_manager.get_search_matcher(search_term, search_mode)
+			rows = [row for row in base_rows if matches(row)]
+		else:
+			rows = self.db_manager.get_items(
+				filter_by=filter_by, sort_by=sort_by, category_filter=category_filter,
+				search_term=search_term, search_mode=search_mode
+			)
+		self._entries[key] = rows
+		if len(self._entries) > self.max_entries:
+			self._entries.popitem(last=False)
+		return rows
+
+	def _find_narrowable(self, key):
+		# Sirve la entrada con el término más largo del que search_term es una ampliación.
+		# El término vacío no cuenta: filtrar la colección completa en Python es más lento que la consulta.
+		# La búsqueda aproximada ordena por puntuación y no se puede reducir así.
+		filters, search_mode, search_term = key[:3], key[3], key[4]
+		kind = self.db_manager.get_search_kind(search_term, search_mode)
+		if kind == 'fuzzy':
+			return None
+		best_term = ""
+		best_rows = None
+		for entry_key, rows in self._entries.items():
+			entry_term = entry_key[4]
+			if (
+				entry_term
+				and len(entry_term) > len(best_term)
+				and entry_key[:4] == filters + (search_mode,)
+				and search_term.startswith(entry_term)
+				and self.db_manager.get_search_kind(entry_term, search_mode) == kind
+			):
+				best_term = entry_term
+				best_rows = rows
+		return best_rows
+
+	def clear(self):
+		self._entries.clear()
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+# Gestor de enlaces - Vigilancia de bloqueos del hilo principal
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2024 Ayoub El Bakhti
+
+import sys
+import threading
+import time
+import traceback
+from . import hooks
+
+# Segundos a partir de los cuales un punto de entrada del hilo principal se considera un bloqueo.
+STALL_THRESHOLD = 0.2
+# Si el bloqueo dura más que esto se avisa en el registro sin esperar a que termine.
+HANG_THRESHOLD = 5.0
+HANG_CHECK_INTERVAL = 0.05
+STACK_LIMIT = 30
+SUMMARY_TOP_ENTRIES = 5
+
+
+class _EntryStats:
+	__slots__ = ("calls", "total", "max", "queue_max", "stalls", "stall_total")
+
+	def __init__(self):
+		self.calls = 0
+		self.total = 0.0
+		self.max = 0.0
+		self.queue_max = 0.0
+		self.stalls = 0
+		self.stall_total = 0.0
+
+
+class _Running:
+	__slots__ = ("kind", "name", "start", "stack")
+
+	def __init__(self, kind, name, start):
+		self.kind = kind
+		self.name = name
+		self.start = start
+		self.stack = None
+
+
+class StallWatchdog:
+	"""Mide cuánto ocupan el hilo principal los scripts, eventos y llamadas encoladas del complemento.
+
+	Un hilo vigilante despierta cuando el hilo principal entra en un punto de entrada; si sigue dentro
+	pasado el umbral guarda su pila, que se escribe en el registro de NVDA junto con la duración y el
+	tiempo de bloqueo acumulado cuando el punto de entrada termina.
+	"""
+
+	def __init__(self, threshold=STALL_THRESHOLD):
+		self.threshold = threshold
+		self.stall_total = 0.0
+		self.stall_count = 0
+		self._stats = {}
+		self._lock = threading.Lock()
+		self._main_thread_id = threading.main_thread().ident
+		self._depth = 0
+		self._running = None
+		self._entered = threading.Event()
+		self._stopping = threading.Event()
+		self._thread = None
+
+	def start(self):
+		self._stopping.clear()
+		self._thread = threading.Thread(target=self._monitor, name="GestorDeEnlacesWatchdog", daemon=True)
+		self._thread.start()
+		hooks.add_observer(self)
+
+	def stop(self, timeout=2.0):
+		hooks.remove_observer(self)
+		self._stopping.set()
+		self._entered.set()
+		if self._thread is not None:
+			self._thread.join(timeout)
+
+	def _get_stats(self, key):
+		stats = self._stats.get(key)
+		if stats is None:
+			stats = self._stats[key] = _EntryStats()
+		return stats
+
+	def queued(self, name, delay):
+		with self._lock:
+			stats = self._get_stats("call_after:" + name)
+			stats.queue_max = max(stats.queue_max, delay)
+
+	def enter(self, kind, name):
+		# Solo interesa el hilo principal; las anidadas cuentan dentro de la más externa.
+		if threading.get_ident() != self._main_thread_id:
+			return None
+		self._depth += 1
+		if self._depth > 1:
+			return None
+		running = self._running = _Running(kind, name, time.perf_counter())
+		self._entered.set()
+		return running
+
+	def pause(self):
+		# Un bucle modal: el punto de entrada en curso deja de contar y lo que despache el bucle se mide
+		# desde cero.
+		if threading.get_ident() != self._main_thread_id:
+			return None
+		paused = (self._depth, self._running, time.perf_counter())
+		self._depth = 0
+		self._running = None
+		return paused
+
+	def resume(self, paused):
+		if paused is None:
+			return
+		depth, running, paused_at = paused
+		self._depth = depth
+		if running is not None:
+			running.start += time.perf_counter() - paused_at
+			self._running = running
+			self._entered.set()
+
+	def exit(self, running):
+		if threading.get_ident() != self._main_thread_id:
+			return
+		self._depth -= 1
+		if running is None:
+			return
+		duration = time.perf_counter() - running.start
+		self._running = None
+		stalled = duration >= self.threshold
+		with self._lock:
+			stats = self._get_stats(f"{running.kind}:{running.name}")
+			stats.calls += 1
+			stats.total += duration
+			stats.max = max(stats.max, duration)
+			if stalled:
+				stats.stalls += 1
+				stats.stall_total += duration
+				self.stall_count += 1
+				self.stall_total += duration
+		if stalled:
+			from logHandler import log
+			log.warning(
+				f"Gestor de Enlaces: {running.kind} {running.name} bloqueó el hilo principal "
+				f"{duration * 1000:.0f} ms (acumulado: {self.stall_total * 1000:.0f} ms en "
+				f"{self.stall_count} bloqueos)\n{running.stack or ''}"
+			)
+
+	def _capture_stack(self):
+		frame = sys._current_frames().get(self._main_thread_id)
+		if frame is None:
+			return None
+		return "".join(traceback.format_stack(frame, limit=STACK_LIMIT))
+
+	def _monitor(self):
+		while True:
+			self._entered.wait()
+			self._entered.clear()
+			if self._stopping.is_set():
+				return
+			running = self._running
+			if running is None:
+				continue
+			remaining = running.start + self.threshold - time.perf_counter()
+			if self._stopping.wait(max(remaining, 0)):
+				return
+			if self._running is not running:
+				continue
+			if running.stack is None:
+				running.stack = self._capture_stack()
+			# Se sigue mirando a menudo para quedar libre en cuanto termine este bloqueo.
+			while self._running is running and time.perf_counter() - running.start < HANG_THRESHOLD:
+				if self._stopping.wait(HANG_CHECK_INTERVAL):
+					return
+			if self._running is running:
+				from logHandler import log
+				log.warning(
+					f"Gestor de Enlaces: {running.kind} {running.name} lleva más de "
+					f"{HANG_THRESHOLD:.0f} s bloqueando el hilo principal\n{self._capture_stack() or ''}"
+				)
+
+	def summary(self):
+		with self._lock:
+			ranked = sorted(self._stats.items(), key=lambda entry: entry[1].max, reverse=True)
+			lines = [
+				f"{name}: {stats.calls} llamadas, media {stats.total / stats.calls * 1000:.1f} ms, "
+				f"máximo {stats.max * 1000:.1f} ms, espera en cola máxima {stats.queue_max * 1000:.1f} ms, "
+				f"{stats.stalls} bloqueos"
+				for name, stats in ranked[:SUMMARY_TOP_ENTRIES] if stats.calls
+			]
+		return lines
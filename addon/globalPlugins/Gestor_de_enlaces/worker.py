@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# Gestor de enlaces - Hilo de trabajo para la base de datos
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2024 Ayoub El Bakhti
+
+import queue
+import threading
+from functools import partial, update_wrapper
+from logHandler import log
+from .hooks import run, describe, call_after
+
+
+class DBWorker:
+	"""Ejecuta las tareas de base de datos en un único hilo y entrega los resultados en el hilo de wx."""
+
+	def __init__(self):
+		self._queue = queue.Queue()
+		self._thread = threading.Thread(target=self._run, name="GestorDeEnlacesDB", daemon=True)
+		self._thread.start()
+
+	def submit(self, func, on_success=None, on_error=None, is_current=None):
+		# is_current permite descartar una petición que ya no interesa, antes de ejecutarla y antes de entregarla.
+		self._queue.put((func, on_success, on_error, is_current))
+
+	def stop(self, timeout=2.0):
+		self._queue.put(None)
+		self._thread.join(timeout)
+
+	def _run(self):
+		while True:
+			task = self._queue.get()
+			if task is None:
+				break
+			func, on_success, on_error, is_current = task
+			if is_current is not None and not is_current():
+				continue
+			try:
+				result = run("db", describe(func), func)
+			except Exception as e:
+				log.error(f"Gestor de Enlaces: Error en tarea de base de datos: {e}", exc_info=True)
+				if on_error is not None:
+					call_after(on_error, e)
+				continue
+			if on_success is not None:
+				# Con el nombre de on_success, para que la entrega se identifique en perfiles y bloqueos.
+				call_after(update_wrapper(partial(self._deliver, on_success, result, is_current), on_success))
+
+	@staticmethod
+	def _deliver(on_success, result, is_current):
+		if is_current is not None and not is_current():
+			return
+		on_success(result)
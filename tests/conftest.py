@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+# Gestor de enlaces - Configuración de las pruebas
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2024 Ayoub El Bakhti
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "tools", "bench"))
+import nvda_stubs  # noqa: E402
+
+nvda_stubs.load_addon()
+from Gestor_de_enlaces.database import DatabaseManager  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+	manager = DatabaseManager(str(tmp_path / "gestor_enlaces.db"))
+	yield manager
+	manager.close()
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+# Gestor de enlaces - Pruebas de la base de datos
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2024 Ayoub El Bakhti
+
+from Gestor_de_enlaces.database import DatabaseManager, JSON_MIGRATION_KEY, UNCATEGORIZED
+
+
+def test_delete_category_in_use(db):
+	db.add_item("GitHub", "https://github.com", "url", "Desarrollo")
+	db.delete_category("Desarrollo")
+	assert [row[1:3] for row in db.get_items()] == [("GitHub", UNCATEGORIZED)]
+	assert "Desarrollo" not in db.get_all_categories()
+
+
+def test_delete_default_category_in_use(db):
+	db.add_item("GitHub", "https://github.com", "url", UNCATEGORIZED)
+	db.delete_category(UNCATEGORIZED)
+	assert [row[1:3] for row in db.get_items()] == [("GitHub", UNCATEGORIZED)]
+
+
+def test_category_trigger_under_outer_conflict_clause(db):
+	db.add_item("GitHub", "https://github.com", "url", UNCATEGORIZED)
+	db.conn.execute("UPDATE OR ROLLBACK items SET category_id = NULL")
+	assert [row[1:3] for row in db.get_items()] == [("GitHub", UNCATEGORIZED)]
+
+
+def test_rename_category_in_use(db):
+	db.add_item("GitHub", "https://github.com", "url", "Desarrollo")
+	db.rename_category("Desarrollo", "Código")
+	assert [row[1:3] for row in db.get_items()] == [("GitHub", "Código")]
+	assert [row[1] for row in db.get_items(category_filter="Código")] == ["GitHub"]
+
+
+def test_search_matches_substrings_and_word_prefixes(db):
+	db.add_item("GitHub", "https://github.com", "url", "Desarrollo")
+	db.add_item("Canción favorita", "https://musica.es", "url", "Música")
+	assert [row[1] for row in db.get_items(search_term="hub")] == ["GitHub"]
+	assert [row[1] for row in db.get_items(search_term="cancion")] == ["Canción favorita"]
+	assert [row[1] for row in db.get_items(search_term="favorita canc")] == ["Canción favorita"]
+
+
+def test_search_matcher_agrees_with_get_items(db):
+	db.add_item("GitHub", "https://github.com", "url", "Desarrollo")
+	db.add_item("Canción favorita", "https://musica.es", "url", "Música")
+	db.add_item("Documentos", "C:\\Users\\docs", "path", "Archivos")
+	rows = db.get_items()
+	for term in ("hub", "git", "cancion", "ción", "docs", "es", "x"):
+		matches = db.get_search_matcher(term)
+		assert [row for row in rows if matches(row)] == db.get_items(search_term=term), term
+
+
+def test_search_without_trigram_tokenizer_matches_word_prefixes(tmp_path, monkeypatch):
+	from Gestor_de_enlaces import database
+	path = str(tmp_path / "gestor_enlaces.db")
+	DatabaseManager(path).close()
+	# Como con el SQLite de lib/_37: los triggers del índice de trigramas se quitan y se buscan prefijos.
+	monkeypatch.setattr(database, "TRIGRAM_FTS_MIN_SQLITE", (99,))
+	db = DatabaseManager(path)
+	try:
+		db.add_item("GitHub", "https://github.com", "url", "Desarrollo")
+		assert db.get_items(search_term="hub") == []
+		assert [row[1] for row in db.get_items(search_term="git")] == ["GitHub"]
+		assert [row[1] for row in db.get_items(search_term="git", search_mode="fuzzy")] == ["GitHub"]
+		matches = db.get_search_matcher("hub")
+		assert not any(matches(row) for row in db.get_items())
+	finally:
+		db.close()
+	monkeypatch.undo()
+	db = DatabaseManager(path)
+	try:
+		assert [row[1] for row in db.get_items(search_term="hub")] == ["GitHub"]
+	finally:
+		db.close()
+
+
+def test_fuzzy_search_tolerates_transpositions(db):
+	db.add_item("GitHub", "https://github.com", "url", "Desarrollo")
+	db.add_item("Mi blog personal", "https://blog.es", "url", "Personal")
+	db.add_item("Wikipedia", "https://wikipedia.org", "url", "Consulta")
+	assert [row[1] for row in db.get_items(search_term="gihtub", search_mode="fuzzy")] == ["GitHub"]
+	assert [row[1] for row in db.get_items(search_term="blgo", search_mode="fuzzy")][0] == "Mi blog personal"
+	assert db.get_items(search_term="zzzz", search_mode="fuzzy") == []
+
+
+def test_bulk_inserts_fill_search_indexes(db, tmp_path):
+	import json
+	backup_path = str(tmp_path / "copia.db")
+	backup = DatabaseManager(backup_path)
+	backup.add_item("GitHub", "https://github.com", "url", "Desarrollo")
+	backup.close()
+	db.add_item("Wikipedia", "https://wikipedia.org", "url", "Consulta")
+	db.restore_from_backup(backup_path)
+	json_path = tmp_path / "links.json"
+	json_path.write_text(json.dumps({"Mi blog personal": "https://blog.es"}), encoding="utf-8")
+	db.migrate_from_json(str(json_path))
+	# Los triggers quitados durante las altas masivas vuelven a indexar las siguientes.
+	db.add_item("Documentos", "C:\\Users\\docs", "path", "Archivos")
+	searches = (("hub", "GitHub"), ("pedia", "Wikipedia"), ("blog", "Mi blog personal"), ("docs", "Documentos"))
+	for term, title in searches:
+		assert [row[1] for row in db.get_items(search_term=term)] == [title]
+	assert [row[1] for row in db.get_items(search_term="gihtub", search_mode="fuzzy")] == ["GitHub"]
+
+
+def test_migration_drops_item_trigrams(tmp_path):
+	path = str(tmp_path / "gestor_enlaces.db")
+	db = DatabaseManager(path)
+	db.add_item("GitHub", "https://github.com", "url", "Desarrollo")
+	# Como una base de datos de la versión 9, con la antigua tabla de trigramas.
+	db.conn.execute("CREATE TABLE item_trigrams (trigram TEXT, item_id INTEGER)")
+	db.conn.execute("PRAGMA user_version = 9")
+	db.conn.commit()
+	db.close()
+	db = DatabaseManager(path)
+	try:
+		tables = {row[0] for row in db.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+		assert "item_trigrams" not in tables
+		assert [row[1] for row in db.get_items(search_term="gihtub", search_mode="fuzzy")] == ["GitHub"]
+	finally:
+		db.close()
+
+
+def test_restore_skips_transient_settings(db, tmp_path):
+	backup_path = str(tmp_path / "copia.db")
+	backup = DatabaseManager(backup_path)
+	backup.add_item("GitHub", "https://github.com", "url", "Desarrollo")
+	backup.set_setting("sort_order", "title")
+	backup.set_setting("last_focused", "999")
+	backup.set_setting(JSON_MIGRATION_KEY, "{}")
+	backup.close()
+	db.set_setting("last_focused", "1")
+	db.restore_from_backup(backup_path)
+	assert db.get_setting("sort_order") == "title"
+	assert db.get_setting("last_focused") == "1"
+	assert db.get_setting(JSON_MIGRATION_KEY) is None
+
+
+def test_deferred_writes_do_not_wait_for_long_operations(db):
+	import threading
+	import time
+	db.add_item("GitHub", "https://github.com", "url", "Desarrollo")
+	item_id = db.get_items()[0][0]
+	db.get_setting("last_focused")
+	locked = threading.Event()
+	release = threading.Event()
+
+	def hold_lock():
+		# Como restore_from_backup, que tiene _lock durante toda la fusión.
+		with db._lock:
+			locked.set()
+			release.wait(5)
+
+	holder = threading.Thread(target=hold_lock)
+	holder.start()
+	locked.wait()
+	try:
+		start = time.perf_counter()
+		db.defer_setting("last_focused", str(item_id))
+		db.increment_usage_count(item_id)
+		assert time.perf_counter() - start < 1
+		assert db.get_setting("last_focused") == str(item_id)
+	finally:
+		release.set()
+		holder.join()
+	db.flush_pending_writes()
+	db._invalidate_settings()
+	assert db.get_setting("last_focused") == str(item_id)
+	assert db.conn.execute("SELECT usage_count FROM items WHERE id = ?", (item_id,)).fetchone() == (1,)
+
+
+def test_flush_trims_old_usage_events(db):
+	import time
+	from Gestor_de_enlaces.database import USAGE_EVENTS_MAX_AGE
+	db.add_item("GitHub", "https://github.com", "url", "Desarrollo")
+	item_id = db.get_items()[0][0]
+	old_use = time.time() - 2 * USAGE_EVENTS_MAX_AGE
+	db.conn.execute("INSERT INTO usage_events (item_id, used_at) VALUES (?, ?)", (item_id, old_use))
+	db.conn.commit()
+	db.increment_usage_count(item_id)
+	db.flush_pending_writes()
+	rows = db.conn.execute("SELECT used_at FROM usage_events").fetchall()
+	assert len(rows) == 1 and rows[0][0] > time.time() - 60
+	plan = db.conn.execute("EXPLAIN QUERY PLAN DELETE FROM usage_events WHERE used_at < 0").fetchall()
+	assert any("idx_usage_events_used_at" in row[-1] for row in plan)
+
+
+def test_add_items_looks_up_values_by_index(db):
+	plan = db.conn.execute(
+		"EXPLAIN QUERY PLAN SELECT value FROM items WHERE value IN (?, ?)", ("a", "b")
+	).fetchall()
+	assert any("idx_items_value" in row[-1] for row in plan)
+
+
+def test_save_links_validates_and_skips_duplicates(db):
+	from Gestor_de_enlaces.from_clipboard import save_links
+	db.add_item("GitHub", "https://github.com", "url", "Desarrollo")
+	links = ["https://github.com", "https://wikipedia.org", "no es un enlace"]
+	assert save_links(db, links, "Desarrollo") == (1, 1, 1)
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+# Gestor de enlaces - Pruebas de los diálogos
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2024 Ayoub El Bakhti
+
+import types
+
+from Gestor_de_enlaces import dialogs
+
+
+def _field(text):
+	return types.SimpleNamespace(GetValue=lambda: text)
+
+
+def test_add_dialog_validates_value_once(db, monkeypatch):
+	calls = []
+
+	def validate(value):
+		calls.append(value)
+		return True, "url"
+
+	monkeypatch.setattr(dialogs, "validateInput", validate)
+	dlg = dialogs.AddEditDialog(None, "Añadir", db)
+	dlg.txtTitle = _field(" GitHub ")
+	dlg.txtValue = _field('"https://github.com"')
+	dlg.itemCategoryCombo = _field("")
+	skipped = []
+	dlg.on_save(types.SimpleNamespace(Skip=lambda: skipped.append(True)))
+	assert skipped == [True]
+	assert dlg.get_item_data() == ("GitHub", "https://github.com", "url", dialogs.UNCATEGORIZED)
+	assert calls == ["https://github.com"]
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Gestor de enlaces - Pruebas de la lectura por partes de links.json
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2024 Ayoub El Bakhti
+
+import io
+import json
+
+import pytest
+
+from Gestor_de_enlaces.database import _JsonObjectReader, JSON_MIGRATION_KEY
+
+# Los números se escriben a mano: json.dumps no genera exponentes como "1.5e3" ni "1E+2".
+DATA = """{
+ "GitHub": "https://github.com",
+ "Canción favorita": {"url": "https://música.es/ñandú", "categories": ["Música 🎵"]},
+ "Documentos": {"path": "C:\\\\Users\\\\docs", "categories": "Archivos"},
+ "números": [-1.5e3, 0, 12, 3.25e-1, -7, 1E+2, -0.5, true, null],
+ "exponente": -1.5e3,
+ "decimal": 3.25e-1,
+ "entero": 120,
+ "mayúscula": 1E+2,
+ "Vacío": {},
+ "__user_defined_categories__": ["Música 🎵", "Código"]
+}""".encode("utf-8")
+ENTRIES = json.loads(DATA)
+# Tamaños de bloque que cortan números, escapes y caracteres de varios bytes por todas partes.
+CHUNK_SIZES = (1, 2, 3, 4, 5, 7, 64 * 1024)
+
+
+def _read(data, offset=0, chunk_size=3):
+	reader = _JsonObjectReader(io.BytesIO(data), offset, chunk_size)
+	pairs = []
+	offsets = []
+	for pair in reader:
+		pairs.append(pair)
+		offsets.append(reader.tell())
+	return pairs, offsets
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_reads_every_pair(chunk_size):
+	assert _read(DATA, chunk_size=chunk_size)[0] == list(ENTRIES.items())
+
+
+@pytest.mark.parametrize("chunk_size", (1, 2, 3))
+def test_number_cut_by_chunk_boundary(chunk_size):
+	assert _read(b'{"a": -1.5e3, "b": 12}', chunk_size=chunk_size)[0] == [("a", -1500.0), ("b", 12)]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_resumes_from_every_offset(chunk_size):
+	pairs, offsets = _read(DATA, chunk_size=chunk_size)
+	for index, offset in enumerate(offsets):
+		assert _read(DATA, offset, chunk_size)[0] == pairs[index + 1:], offset
+
+
+def test_truncated_file_yields_only_complete_pairs():
+	pairs = list(ENTRIES.items())
+	for length in range(len(DATA)):
+		read = []
+		with pytest.raises(ValueError):
+			for pair in _JsonObjectReader(io.BytesIO(DATA[:length]), chunk_size=3):
+				read.append(pair)
+		assert read == pairs[:len(read)], length
+
+
+def test_migration_keeps_pairs_before_truncation(db, tmp_path):
+	json_path = tmp_path / "links.json"
+	data = json.dumps({"GitHub": "https://github.com", "Wikipedia": "https://wikipedia.org"}).encode("utf-8")
+	json_path.write_bytes(data[:data.index(b"wikipedia.org") + 4])
+	assert db.migrate_from_json(str(json_path)) == 1
+	assert [row[1] for row in db.get_items()] == ["GitHub"]
+	assert db.get_setting(JSON_MIGRATION_KEY) is None
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# Gestor de enlaces - Pruebas de la comprobación de rutas
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2024 Ayoub El Bakhti
+
+import threading
+
+from Gestor_de_enlaces import path_checker
+from Gestor_de_enlaces.path_checker import PathExistenceService, PathHealthScanner
+
+
+def test_hung_paths_use_a_bounded_number_of_threads(monkeypatch):
+	release = threading.Event()
+	monkeypatch.setattr(path_checker.os.path, "exists", lambda path: release.wait())
+	service = PathExistenceService(timeout=0.01, workers=2)
+	try:
+		paths = [f"\\\\servidor\\recurso{n}" for n in range(10)]
+		assert service.exists_many(paths) == dict.fromkeys(paths)
+		assert len(service._threads) == 2
+	finally:
+		release.set()
+
+
+def test_scan_leaves_unanswered_paths_unchecked(db, monkeypatch):
+	release = threading.Event()
+	monkeypatch.setattr(
+		path_checker.os.path, "exists", lambda path: path == "C:\\existe" or release.wait()
+	)
+	db.add_item("Existe", "C:\\existe", "path", "Rutas")
+	db.add_item("Colgada", "\\\\servidor\\recurso", "path", "Rutas")
+	service = PathExistenceService(timeout=0.2)
+	try:
+		assert PathHealthScanner(db, service).scan() == 1
+		rows = db.conn.execute("SELECT title, path_ok, checked_at IS NOT NULL FROM items ORDER BY title").fetchall()
+		assert rows == [("Colgada", None, 0), ("Existe", 1, 1)]
+	finally:
+		release.set()
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# Gestor de enlaces - Pruebas del GlobalPlugin
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2024 Ayoub El Bakhti
+
+import sqlite3
+
+import Gestor_de_enlaces
+
+
+def test_scripts_work_without_database(tmp_path, monkeypatch):
+	import globalVars
+
+	def fail(db_path):
+		raise sqlite3.OperationalError("disk I/O error")
+
+	monkeypatch.setattr(globalVars.appArgs, "configPath", str(tmp_path))
+	monkeypatch.setattr(Gestor_de_enlaces, "DatabaseManager", fail)
+	plugin = Gestor_de_enlaces.GlobalPlugin()
+	try:
+		plugin.script_open_clipboard_link(None)
+		plugin.script_next_link(None)
+		plugin.script_next_category(None)
+	finally:
+		plugin.terminate()
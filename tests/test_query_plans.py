@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# Gestor de enlaces - Planes de las consultas de la lista
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2024 Ayoub El Bakhti
+
+import itertools
+
+import pytest
+
+# Las combinaciones que puede pedir display_items: filtro (con la categoría del filtro 3) × orden × búsqueda.
+FILTERS = (('all', None), ('url', None), ('path', None), ('all', "Desarrollo"), ('broken', None))
+SORTS = (
+	'alpha_asc', 'alpha_desc', 'date_desc', 'date_asc',
+	'usage_desc', 'category_asc', 'category_desc', 'frecency_desc',
+)
+# (término, modo, tipo de búsqueda que debe resultar)
+SEARCHES = (
+	(None, 'fts', None),
+	("ca", 'fts', 'fts'),
+	("web", 'fts', 'substring'),
+	("gihtub", 'fuzzy', 'fuzzy'),
+)
+
+
+@pytest.fixture
+def populated_db(db):
+	for index in range(40):
+		db.add_item(f"Web {index}", f"https://example{index}.com", "url", f"Categoría {index % 4}")
+		db.add_item(f"Carpeta {index}", f"C:\\datos\\{index}", "path", "Desarrollo")
+	db.set_path_health([(item_id, index % 3 != 0) for index, (item_id, *_) in enumerate(db.get_items())], 0.0)
+	return db
+
+
+def _query_plan(db, **kwargs):
+	statements = []
+	db.conn.set_trace_callback(statements.append)
+	try:
+		db.get_items(**kwargs)
+	finally:
+		db.conn.set_trace_callback(None)
+	query = [statement for statement in statements if statement.lstrip().startswith(("SELECT", "WITH"))][-1]
+	return [row[3] for row in db.conn.execute("EXPLAIN QUERY PLAN " + query)]
+
+
+@pytest.mark.parametrize(
+	("filter_by", "category_filter", "sort_by", "search_term", "search_mode", "search_kind"),
+	[
+		(filter_by, category_filter, sort_by) + search
+		for (filter_by, category_filter), sort_by, search in itertools.product(FILTERS, SORTS, SEARCHES)
+	]
+)
+def test_list_query_plan(
+		populated_db, filter_by, category_filter, sort_by, search_term, search_mode, search_kind
+):
+	assert populated_db.get_search_kind(search_term, search_mode) == search_kind
+	plan = _query_plan(
+		populated_db, filter_by=filter_by, sort_by=sort_by, category_filter=category_filter,
+		search_term=search_term, search_mode=search_mode
+	)
+	# Nunca se lee items entera sin índice: se llega por el índice del filtro o por los rowid de la búsqueda.
+	assert "SCAN i" not in plan, plan
+	if search_kind is None:
+		# Sin búsqueda el orden sale siempre de un índice.
+		assert not [step for step in plan if "TEMP B-TREE" in step], plan
+	elif search_kind != 'fuzzy':
+		# Excepción documentada: con búsqueda, salvo que el filtro ya traiga el orden de su índice, se ordenan
+		# en memoria solo las coincidencias, que el índice de texto entrega por rowid; la búsqueda por subcadena
+		# además une sin repetidos los rowid de sus dos índices.
+		assert [step for step in plan if "items_fts" in step], plan
+		temp_btrees = {step for step in plan if "TEMP B-TREE" in step}
+		assert temp_btrees <= {"USE TEMP B-TREE FOR ORDER BY", "UNION USING TEMP B-TREE"}, plan
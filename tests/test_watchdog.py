@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# Gestor de enlaces - Pruebas de la vigilancia de bloqueos
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2024 Ayoub El Bakhti
+
+import time
+
+import pytest
+
+from Gestor_de_enlaces import hooks
+from Gestor_de_enlaces.watchdog import StallWatchdog
+
+THRESHOLD = 0.05
+
+
+@pytest.fixture
+def watchdog():
+	watchdog = StallWatchdog(THRESHOLD)
+	watchdog.start()
+	yield watchdog
+	watchdog.stop()
+
+
+def _modal_loop(*events):
+	# Lo que hace ShowModal: esperar al usuario y despachar eventos mientras tanto.
+	time.sleep(THRESHOLD * 2)
+	for name, duration in events:
+		hooks.run("event", name, time.sleep, duration)
+	time.sleep(THRESHOLD * 2)
+
+
+def test_time_in_modal_loop_is_not_a_stall(watchdog):
+	hooks.run("script", "on_settings", hooks.run_modal, _modal_loop, ("on_save", 0))
+	assert watchdog.stall_count == 0
+	assert watchdog._stats["script:on_settings"].calls == 1
+	assert watchdog._stats["script:on_settings"].max < THRESHOLD
+	assert watchdog._stats["event:on_save"].calls == 1
+
+
+def test_events_in_modal_loop_are_measured_on_their_own(watchdog):
+	hooks.run("script", "on_settings", hooks.run_modal, _modal_loop, ("on_save", THRESHOLD * 2))
+	assert watchdog.stall_count == 1
+	assert watchdog._stats["event:on_save"].stalls == 1
+	assert watchdog._stats["script:on_settings"].stalls == 0
+
+
+def test_work_around_modal_loop_still_counts(watchdog):
+	def on_settings():
+		time.sleep(THRESHOLD)
+		hooks.run_modal(_modal_loop)
+		time.sleep(THRESHOLD)
+
+	hooks.run("script", "on_settings", on_settings)
+	assert watchdog._stats["script:on_settings"].stalls == 1
+	assert watchdog._stats["script:on_settings"].max < THRESHOLD * 4
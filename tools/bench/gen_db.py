@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# Gestor de enlaces - Generador de bases de datos sintéticas para las pruebas de rendimiento
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2024 Ayoub El Bakhti
+
+"""Crea bases de datos del complemento con N elementos de distribución realista.
+
+- Categorías con reparto tipo Zipf: unas pocas concentran la mayoría de los elementos.
+- 80 % enlaces y 20 % rutas; un 5 % de las rutas marcadas como rotas.
+- Fechas de creación repartidas en tres años y usos con cola larga (la mayoría nunca usados).
+
+Uso: python gen_db.py 100000 salida.db
+"""
+
+import json
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+CATEGORY_COUNT = 40
+URL_SHARE = 0.8
+BROKEN_PATH_SHARE = 0.05
+CREATED_SPAN_DAYS = 3 * 365
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "gestor_enlaces_bench")
+
+_SYLLABLES = (
+	"ca", "sa", "ma", "lo", "re", "ti", "no", "de", "la", "ver", "mun", "dial", "red", "web", "pro",
+	"to", "gra", "ma", "ci", "on", "in", "for", "tec", "no", "lo", "gia", "ar", "chi", "vo", "da",
+)
+_TLDS = ("com", "org", "es", "net", "io", "dev", "edu", "info")
+_EXTENSIONS = ("txt", "docx", "pdf", "xlsx", "mp3", "png", "zip", "lnk")
+
+
+def _word(rng):
+	return "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def _zipf_weights(count, exponent=1.1):
+	return [1.0 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+def iter_items(count, seed=0):
+	"""Genera dicts con title, value, type y category."""
+	rng = random.Random(seed)
+	categories = [_word(rng).capitalize() for _ in range(CATEGORY_COUNT)]
+	weights = _zipf_weights(CATEGORY_COUNT)
+	domains = [f"{_word(rng)}.{rng.choice(_TLDS)}" for _ in range(max(50, count // 20))]
+	for index in range(count):
+		words = " ".join(_word(rng) for _ in range(rng.randint(2, 6))).capitalize()
+		# El índice al final garantiza títulos únicos, como exige la tabla items.
+		title = f"{words} {index}"
+		if rng.random() < URL_SHARE:
+			item_type = "url"
+			path = "/".join(_word(rng) for _ in range(rng.randint(0, 4)))
+			value = f"https://{rng.choice(domains)}/{path}"
+		else:
+			item_type = "path"
+			folders = "\\".join(_word(rng) for _ in range(rng.randint(1, 4)))
+			value = f"C:\\Users\\usuario\\{folders}\\{_word(rng)}.{rng.choice(_EXTENSIONS)}"
+		category = rng.choices(categories, weights)[0]
+		yield {"title": title, "value": value, "type": item_type, "category": category}
+
+
+def generate(db_path, count, seed=0):
+	"""Crea db_path con count elementos sobre el esquema del complemento (migraciones y triggers incluidos)."""
+	from Gestor_de_enlaces.database import DatabaseManager, FRECENCY_TAU
+	for suffix in ("", "-wal", "-shm"):
+		if os.path.exists(db_path + suffix):
+			os.remove(db_path + suffix)
+	db = DatabaseManager(db_path)
+	cursor = db.conn.cursor()
+	items = list(iter_items(count, seed))
+	categories = sorted({item["category"] for item in items})
+	cursor.executemany("INSERT OR IGNORE INTO categories (name) VALUES (?)", [(name,) for name in categories])
+	cursor.execute("SELECT name, id FROM categories")
+	category_ids = dict(cursor.fetchall())
+	cursor.executemany(
+		"INSERT INTO items (title, value, type, category_id) VALUES (?, ?, ?, ?)",
+		[(item["title"], item["value"], item["type"], category_ids[item["category"]]) for item in items]
+	)
+	db.conn.commit()
+	del items
+
+	rng = random.Random(seed + 1)
+	now = time.time()
+	updates = []
+	health = []
+	cursor = db.conn.cursor()
+	cursor.execute("SELECT id, type FROM items")
+	for item_id, item_type in cursor.fetchall():
+		created = now - rng.random() * CREATED_SPAN_DAYS * 86400
+		# Cola larga: el 60 % nunca se ha usado y unos pocos se usan cientos de veces.
+		usage = 0 if rng.random() < 0.6 else int(rng.paretovariate(1.2))
+		frecency = created + FRECENCY_TAU * math.log(usage) if usage else None
+		updates.append((time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(created)), usage, frecency, item_id))
+		if item_type == "path":
+			health.append((0 if rng.random() < BROKEN_PATH_SHARE else 1, created, item_id))
+	cursor.executemany("UPDATE items SET created_at = ?, usage_count = ?, frecency = ? WHERE id = ?", updates)
+	cursor.executemany("UPDATE items SET path_ok = ?, checked_at = ? WHERE id = ?", health)
+	db.conn.commit()
+	db.close()
+	return db_path
+
+
+def cached_copy(count, target_path, seed=0):
+	"""Copia en target_path una base de datos de count elementos, generándola solo la primera vez."""
+	os.makedirs(CACHE_DIR, exist_ok=True)
+	cached = os.path.join(CACHE_DIR, f"items_{count}_{seed}.db")
+	if not os.path.exists(cached):
+		generate(cached + ".tmp", count, seed)
+		os.replace(cached + ".tmp", cached)
+	else:
+		# Aplica las migraciones añadidas desde que se generó, para que no se midan en cada copia.
+		from Gestor_de_enlaces.database import DatabaseManager
+		DatabaseManager(cached).close()
+	shutil.copyfile(cached, target_path)
+	return target_path
+
+
+def write_legacy_json(json_path, count, seed=0):
+	"""Escribe un links.json del formato antiguo con count entradas."""
+	with open(json_path, "w", encoding="utf-8") as f:
+		categories = set()
+		f.write("{")
+		for index, item in enumerate(iter_items(count, seed)):
+			categories.add(item["category"])
+			key = "url" if item["type"] == "url" else "path"
+			entry = {key: item["value"], "categories": [item["category"]]}
+			f.write(("" if index == 0 else ",\n") + json.dumps(item["title"]) + ": " + json.dumps(entry))
+		f.write(",\n" + json.dumps("__user_defined_categories__") + ": " + json.dumps(sorted(categories)))
+		f.write("}")
+	return json_path
+
+
+if __name__ == "__main__":
+	import nvda_stubs
+	nvda_stubs.load_addon()
+	generate(sys.argv[2], int(sys.argv[1]))
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+# Gestor de enlaces - Módulos falsos de NVDA y wx para ejecutar el complemento fuera de NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2024 Ayoub El Bakhti
+
+"""Sustitutos mínimos de los módulos de NVDA y de wx.
+
+Bastan para importar el paquete Gestor_de_enlaces en Linux, crear GlobalPlugin y DatabaseManager
+y llamar a los scripts. No dibujan nada: los controles de wx aceptan cualquier llamada y devuelven
+otro objeto igual de permisivo. ui.message guarda los mensajes en ui.messages.
+"""
+
+import builtins
+import itertools
+import os
+import sys
+import tempfile
+import types
+
+ADDON_PLUGINS_DIR = os.path.abspath(
+	os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "addon", "globalPlugins")
+)
+PACKAGE_NAME = "Gestor_de_enlaces"
+
+
+class Anything:
+	"""Objeto que acepta cualquier atributo, llamada o uso como gestor de contexto."""
+
+	def __init__(self, *args, **kwargs):
+		pass
+
+	def __getattr__(self, name):
+		if name.startswith("__"):
+			raise AttributeError(name)
+		return Anything()
+
+	def __call__(self, *args, **kwargs):
+		return Anything()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		return False
+
+	def __iter__(self):
+		return iter(())
+
+	def __len__(self):
+		return 0
+
+	def __int__(self):
+		return 0
+
+	def __index__(self):
+		return 0
+
+	def __or__(self, other):
+		return self
+
+	__ror__ = __or__
+
+
+class _WxModule(types.ModuleType):
+	# Las constantes (wx.OK, wx.EVT_BUTTON...) son enteros distintos; el resto, clases permisivas.
+	_ids = itertools.count(1000)
+
+	def __getattr__(self, name):
+		if name.startswith("__"):
+			raise AttributeError(name)
+		if name.isupper() or name.startswith(("ID_", "EVT_", "WXK_", "LC_", "FD_", "ICON_")):
+			value = next(self._ids)
+		else:
+			value = type(name, (Anything,), {})
+		setattr(self, name, value)
+		return value
+
+
+def _module(name, **attrs):
+	module = types.ModuleType(name)
+	module.__dict__.update(attrs)
+	sys.modules[name] = module
+	return module
+
+
+class _Log:
+	def __init__(self):
+		self.records = []
+
+	def _record(self, level):
+		def log(msg, *args, **kwargs):
+			self.records.append((level, msg % args if args else msg))
+		return log
+
+	def __getattr__(self, name):
+		if name in ("debug", "info", "warning", "error", "exception", "debugWarning"):
+			return self._record(name)
+		raise AttributeError(name)
+
+
+def install(config_path=None):
+	"""Registra los módulos falsos en sys.modules. config_path hace de carpeta de configuración de NVDA."""
+	if config_path is None:
+		config_path = tempfile.mkdtemp(prefix="gestor_enlaces_")
+	builtins._ = lambda text: text
+	builtins.ngettext = lambda singular, plural, n: singular if n == 1 else plural
+	builtins.pgettext = lambda context, text: text
+
+	wx = _WxModule("wx")
+	wx.CallAfter = lambda func, *args, **kwargs: func(*args, **kwargs)
+	wx.CallLater = lambda millis, func, *args, **kwargs: func(*args, **kwargs)
+	wx.MessageBox = lambda *args, **kwargs: wx.YES
+	sys.modules["wx"] = wx
+
+	_module("globalVars", appArgs=types.SimpleNamespace(configPath=config_path, secure=False))
+
+	class GlobalPlugin:
+		def __init__(self):
+			pass
+
+		def terminate(self):
+			pass
+
+	_module("globalPluginHandler", GlobalPlugin=GlobalPlugin)
+
+	def script(**kwargs):
+		return lambda func: func
+
+	_module("scriptHandler", script=script, getLastScriptRepeatCount=lambda: 0)
+
+	messages = []
+	_module(
+		"ui", messages=messages, message=lambda text, *args, **kwargs: messages.append(text),
+		reportTextCopiedToClipboard=lambda text=None: messages.append(text)
+	)
+	clipboard = {"text": ""}
+
+	def copyToClip(text, *args, **kwargs):
+		clipboard["text"] = text
+		return True
+
+	_module(
+		"api", clipboard=clipboard, getClipData=lambda: clipboard["text"], copyToClip=copyToClip,
+		getFocusObject=Anything, getNavigatorObject=Anything, getForegroundObject=Anything
+	)
+	_module("gui", mainFrame=Anything(), messageBox=lambda *args, **kwargs: 0)
+
+	class SpeechMode:
+		off = 0
+		beeps = 1
+		talk = 2
+
+	state = types.SimpleNamespace(speechMode=SpeechMode.talk)
+
+	def setSpeechMode(mode):
+		state.speechMode = mode
+
+	_module("speech", SpeechMode=SpeechMode, getState=lambda: state, setSpeechMode=setSpeechMode)
+
+	class AddonError(Exception):
+		pass
+
+	_module("addonHandler", initTranslation=lambda: None, AddonError=AddonError)
+	_module("logHandler", log=_Log())
+	return config_path
+
+
+def load_addon(config_path=None):
+	"""Instala los módulos falsos e importa el paquete del complemento. Devuelve (paquete, config_path)."""
+	config_path = install(config_path)
+	if ADDON_PLUGINS_DIR not in sys.path:
+		sys.path.insert(0, ADDON_PLUGINS_DIR)
+	import importlib
+	return importlib.import_module(PACKAGE_NAME), config_path
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+# Gestor de enlaces - Pruebas de rendimiento sin NVDA
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2024 Ayoub El Bakhti
+
+"""Mide el complemento en Linux con módulos falsos de NVDA y wx y bases de datos sintéticas.
+
+Cubre get_items para cada pareja de filtro y orden, las búsquedas, los scripts de navegación,
+el arranque de GlobalPlugin, la restauración y exportación de copias, la migración desde links.json
+(ambas con tantos elementos como la base de datos) y el extractor de enlaces del portapapeles.
+Además comprueba con EXPLAIN QUERY PLAN que ninguna consulta de get_items necesite un B-tree
+temporal, y muestra cuánto ocupan los índices de búsqueda y cuánto tarda en construirse el de trigramas.
+
+Cada tiempo (mediana de varias repeticiones) se divide por el de REFERENCE_CASE, una carga fija de
+SQLite y Python medida en la misma ejecución, y esa proporción se compara con la de baselines.json:
+así la referencia guardada sirve en otras máquinas. Se marca regresión lo que supere la tolerancia,
+y el proceso termina con código 1 si hay regresiones o planes con B-tree temporal.
+
+Uso:
+	python tools/bench/run.py --sizes 1000 10000 100000
+	python tools/bench/run.py --sizes 1000000 --only get_items
+	python tools/bench/run.py --save-baseline
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import nvda_stubs  # noqa: E402
+
+nvda_stubs.load_addon()
+import gen_db  # noqa: E402
+from Gestor_de_enlaces import GlobalPlugin  # noqa: E402
+from Gestor_de_enlaces.database import DatabaseManager  # noqa: E402
+from Gestor_de_enlaces.from_clipboard import extract_urls  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+DEFAULT_SIZES = (1000, 10000, 100000)
+# Las combinaciones de filter_by y category_filter que construye get_items; "x+category" filtra por tipo x
+# dentro de la categoría más grande.
+FILTERS = ("all", "url", "path", "broken", "category", "url+category", "path+category", "broken+category")
+SORTS = (
+	"alpha_asc", "alpha_desc", "date_desc", "date_asc", "usage_desc",
+	"category_asc", "category_desc", "frecency_desc",
+)
+# (search_mode, término) de las búsquedas medidas.
+SEARCHES = (("fts", "web"), ("fts", "ca"), ("fuzzy", "mundail"), ("fuzzy", "tecnologia"), ("like", "gia"))
+CLIPBOARD_SIZE = 4 * 1024 * 1024
+# Diferencias por debajo de este umbral (segundos) se consideran ruido.
+NOISE_FLOOR = 0.001
+REFERENCE_CASE = "reference"
+REFERENCE_ROWS = 20000
+
+
+def measure(func, repeat):
+	timings = []
+	for _ in range(repeat):
+		start = time.perf_counter()
+		func()
+		timings.append(time.perf_counter() - start)
+	return statistics.median(timings)
+
+
+def bench_reference(repeat):
+	# Ajena al complemento: ordena en SQLite y en Python una tabla en memoria siempre igual.
+	conn = sqlite3.connect(":memory:")
+	try:
+		rng = random.Random(0)
+		conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, title TEXT)")
+		conn.executemany(
+			"INSERT INTO t (title) VALUES (?)",
+			[("".join(rng.choices(string.ascii_letters, k=12)),) for _ in range(REFERENCE_ROWS)]
+		)
+
+		def workload():
+			rows = conn.execute("SELECT id, title FROM t ORDER BY title COLLATE NOCASE").fetchall()
+			sorted(rows, key=lambda row: row[1].lower())
+
+		return measure(workload, repeat)
+	finally:
+		conn.close()
+
+
+def _largest_category(db):
+	cursor = db.conn.cursor()
+	cursor.execute(
+		"SELECT c.name FROM items i JOIN categories c ON i.category_id = c.id "
+		"GROUP BY c.id ORDER BY COUNT(*) DESC LIMIT 1"
+	)
+	return cursor.fetchone()[0]
+
+
+def _get_items_args(db, filter_name, sort_by):
+	filter_by, _sep, category = filter_name.partition("+")
+	if filter_by == "category":
+		filter_by, category = "all", "category"
+	kwargs = {"filter_by": filter_by, "sort_by": sort_by}
+	if category:
+		kwargs["category_filter"] = _largest_category(db)
+	return kwargs
+
+
+def bench_queries(workdir, size, repeat, results, plans, sizes):
+	db = DatabaseManager(gen_db.cached_copy(size, os.path.join(workdir, "queries.db")))
+	try:
+		for filter_name in FILTERS:
+			for sort_by in SORTS:
+				kwargs = _get_items_args(db, filter_name, sort_by)
+				results[f"get_items[{filter_name},{sort_by}]"] = measure(lambda: db.get_items(**kwargs), repeat)
+				plans[f"{filter_name},{sort_by}"] = explain(db, kwargs)
+		for mode, term in SEARCHES:
+			results[f"search[{mode},{term}]"] = measure(
+				lambda: db.get_items(search_term=term, search_mode=mode), repeat
+			)
+		results["nav_items"] = measure(db.get_all_items_for_nav, repeat)
+		sizes.update(index_sizes(db))
+		if db.trigram_fts_enabled:
+			results["build[items_trigram_fts]"] = measure(
+				lambda: db._run_in_transaction(rebuild_trigram_index, db), 1
+			)
+	finally:
+		db.close()
+
+
+def rebuild_trigram_index(db):
+	db._drop_trigram_fts_triggers()
+	db._create_trigram_fts_index()
+
+
+def index_sizes(db):
+	# Bytes de la base de datos y de cada índice de búsqueda con sus tablas internas; vacío si SQLite
+	# se compiló sin dbstat.
+	try:
+		rows = db.conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name").fetchall()
+	except sqlite3.OperationalError:
+		return {}
+	sizes = {"database": sum(size for _name, size in rows)}
+	for table in ("items_fts", "items_trigram_fts"):
+		sizes[table] = sum(size for name, size in rows if name == table or name.startswith(table + "_"))
+	return sizes
+
+
+def explain(db, kwargs):
+	# Captura la SQL con los parámetros ya sustituidos y pide su plan.
+	statements = []
+	db.conn.set_trace_callback(statements.append)
+	try:
+		db.get_items(**kwargs)
+	finally:
+		db.conn.set_trace_callback(None)
+	query = next(sql for sql in reversed(statements) if sql.lstrip().upper().startswith("SELECT"))
+	return [row[3] for row in db.conn.execute("EXPLAIN QUERY PLAN " + query)]
+
+
+def bench_plugin(workdir, size, repeat, results):
+	import globalVars
+	import ui
+	config_path = os.path.join(workdir, "config")
+	os.makedirs(config_path)
+	globalVars.appArgs.configPath = config_path
+	gen_db.cached_copy(size, os.path.join(config_path, "gestor_enlaces.db"))
+
+	timings = []
+	for _ in range(repeat - 1):
+		start = time.perf_counter()
+		GlobalPlugin().terminate()
+		timings.append(time.perf_counter() - start)
+	start = time.perf_counter()
+	plugin = GlobalPlugin()
+	timings.append(time.perf_counter() - start)
+	results["startup"] = statistics.median(timings)
+	try:
+		def cold_next_link():
+			# Simula un cambio en la base de datos: el índice de navegación se reconstruye.
+			plugin._db_manager.change_counter += 1
+			plugin.script_next_link(None)
+
+		results["nav[cold]"] = measure(cold_next_link, repeat)
+		results["nav[next_link]"] = measure(lambda: plugin.script_next_link(None), repeat)
+		results["nav[previous_link]"] = measure(lambda: plugin.script_previous_link(None), repeat)
+		results["nav[next_category]"] = measure(lambda: plugin.script_next_category(None), repeat)
+		results["nav[previous_category]"] = measure(lambda: plugin.script_previous_category(None), repeat)
+		del ui.messages[:]
+	finally:
+		plugin.terminate()
+
+
+def bench_writes(workdir, size, results):
+	# La copia restaurada y links.json tienen tantos elementos como la base de datos: con --sizes 100000
+	# o 1000000 se reproducen las medidas de fusión a esa escala.
+	backup_path = gen_db.cached_copy(size, os.path.join(workdir, "backup.db"), seed=size + 11)
+	db = DatabaseManager(gen_db.cached_copy(size, os.path.join(workdir, "restore.db")))
+	try:
+		start = time.perf_counter()
+		db.restore_from_backup(backup_path)
+		results["restore"] = time.perf_counter() - start
+		start = time.perf_counter()
+		db.backup_to(os.path.join(workdir, "export.db"))
+		results["backup_to"] = time.perf_counter() - start
+	finally:
+		db.close()
+
+	json_path = gen_db.write_legacy_json(os.path.join(workdir, "links.json"), size, seed=size + 13)
+	db = DatabaseManager(os.path.join(workdir, "migrate.db"))
+	try:
+		start = time.perf_counter()
+		db.migrate_from_json(json_path)
+		results["migrate_json"] = time.perf_counter() - start
+	finally:
+		db.close()
+
+
+def bench_clipboard(repeat, results):
+	chunk = "Texto con un enlace https://ejemplo.com/ruta?x=1 y base64 " + "QUJD" * 200 + "\n"
+	text = (chunk * (CLIPBOARD_SIZE // len(chunk) + 1))[:CLIPBOARD_SIZE]
+	results["extract_urls[4MB]"] = measure(lambda: extract_urls(text), repeat)
+
+
+def run_size(size, repeat, only):
+	results = {}
+	plans = {}
+	sizes = {}
+	with tempfile.TemporaryDirectory(prefix="gestor_bench_") as workdir:
+		if not only or "get_items" in only or "search" in only:
+			bench_queries(workdir, size, repeat, results, plans, sizes)
+		if not only or "nav" in only or "startup" in only:
+			bench_plugin(workdir, size, repeat, results)
+		if not only or "write" in only:
+			bench_writes(workdir, size, results)
+		if not only or "clipboard" in only:
+			bench_clipboard(repeat, results)
+	return results, plans, sizes
+
+
+def compare(size, results, reference, baselines, tolerance):
+	# Las columnas rel y base rel son tiempos divididos por el de REFERENCE_CASE.
+	regressions = []
+	baseline = baselines.get(str(size), {})
+	print(f"\n== {size} elementos ==")
+	print(f"{'prueba':<44}{'ms':>10}{'rel':>10}{'base rel':>10}{'ratio':>8}")
+	for name, seconds in results.items():
+		relative = seconds / reference
+		base = baseline.get(name)
+		ratio = relative / base if base else None
+		flag = ""
+		if base and ratio > tolerance and (relative - base) * reference > NOISE_FLOOR:
+			flag = "  REGRESIÓN"
+			regressions.append(name)
+		base_text = f"{base:10.4f}" if base else f"{'-':>10}"
+		ratio_text = f"{ratio:8.2f}" if ratio else f"{'-':>8}"
+		print(f"{name:<44}{seconds * 1000:10.2f}{relative:10.4f}{base_text}{ratio_text}{flag}")
+	return regressions
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+	parser.add_argument("--repeat", type=int, default=5)
+	parser.add_argument("--only", nargs="*", help="get_items, search, nav, startup, write, clipboard")
+	parser.add_argument("--baseline", default=BASELINE_PATH)
+	parser.add_argument(
+		"--save-baseline", action="store_true", help="guarda las proporciones de esta ejecución como referencia"
+	)
+	parser.add_argument("--tolerance", type=float, default=1.5, help="ratio a partir del cual hay regresión")
+	args = parser.parse_args(argv)
+
+	baselines = {}
+	if os.path.exists(args.baseline):
+		with open(args.baseline, encoding="utf-8") as f:
+			baselines = json.load(f)
+
+	reference = bench_reference(args.repeat)
+	print(f"{REFERENCE_CASE}: {reference * 1000:.2f} ms")
+	regressions = []
+	bad_plans = []
+	for size in args.sizes:
+		results, plans, sizes = run_size(size, args.repeat, args.only)
+		regressions.extend(
+			f"{name} ({size})" for name in compare(size, results, reference, baselines, args.tolerance)
+		)
+		for name, size_bytes in sizes.items():
+			print(f"{'size[' + name + ']':<44}{size_bytes / 1024 / 1024:10.2f} MB")
+		for combo, plan in plans.items():
+			if any("TEMP B-TREE" in step for step in plan):
+				bad_plans.append(f"{combo} ({size}): {plan}")
+		if args.save_baseline:
+			baselines.setdefault(str(size), {}).update(
+				(name, seconds / reference) for name, seconds in results.items()
+			)
+
+	if args.save_baseline:
+		with open(args.baseline, "w", encoding="utf-8") as f:
+			json.dump(baselines, f, indent="\t", sort_keys=True)
+			f.write("\n")
+		print(f"\nReferencia guardada en {args.baseline}")
+	for line in bad_plans:
+		print("B-tree temporal:", line)
+	if regressions:
+		print("\nRegresiones:", ", ".join(regressions))
+	return 1 if regressions or bad_plans else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())